@@ -24,6 +24,62 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 DEFAULT_CONFIG_PATH = os.path.join(BASE_DIR, "default.json")
 GOOGLE_FONTS_API_KEY = os.getenv("GOOGLE_FONTS_API_KEY")
 
+# Optional single-file bundle of fonts built with "manage.py build_font_pack".
+# It is opened read-only and memory-mapped, so it can be shared between
+# containers.
+FONT_PACK_PATH = os.getenv(
+    "FONT_PACK_PATH", os.path.join(BASE_DIR, "font_cache", "fonts.pack")
+)
+
+# Seconds a worker waits for another one to finish downloading the same font
+FILE_LOCK_TIMEOUT = float(os.getenv("FILE_LOCK_TIMEOUT", "60"))
+
+# Limits for the process-wide cache of loaded font objects
+FONT_CACHE_MAX_ENTRIES = int(os.getenv("FONT_CACHE_MAX_ENTRIES", "128"))
+FONT_CACHE_MAX_BYTES = int(os.getenv("FONT_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+
+# Byte budgets for subset fonts and base64-encoded @font-face rules embedded
+# into SVGs
+FONT_SUBSET_CACHE_MAX_BYTES = int(
+    os.getenv("FONT_SUBSET_CACHE_MAX_BYTES", str(16 * 1024 * 1024))
+)
+FONT_FACE_CACHE_MAX_BYTES = int(
+    os.getenv("FONT_FACE_CACHE_MAX_BYTES", str(32 * 1024 * 1024))
+)
+
+# Compiled render plans kept for configs that differ only in their texts
+RENDER_PLAN_CACHE_MAX_ENTRIES = int(os.getenv("RENDER_PLAN_CACHE_MAX_ENTRIES", "256"))
+
+# Render cache: in-process LRU first, then a directory shared by all workers.
+# Set RENDER_CACHE_DIR to an empty string to disable the shared level.
+RENDER_CACHE_MAX_BYTES = int(os.getenv("RENDER_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+RENDER_CACHE_DIR = os.getenv("RENDER_CACHE_DIR", os.path.join(BASE_DIR, "render_cache"))
+RENDER_CACHE_DISK_MAX_BYTES = int(
+    os.getenv("RENDER_CACHE_DISK_MAX_BYTES", str(512 * 1024 * 1024))
+)
+
+# SVG renders are stored with gzip and brotli variants, compressed once when
+# rendered. Brotli's top qualities cost hundreds of milliseconds on SVGs with
+# embedded fonts for a few percent, so a middle quality is the default.
+RENDER_GZIP_LEVEL = int(os.getenv("RENDER_GZIP_LEVEL", "9"))
+RENDER_BROTLI_QUALITY = int(os.getenv("RENDER_BROTLI_QUALITY", "5"))
+
+# Executors used by the async render endpoint: renders run on a "thread" or
+# "process" pool, font downloads on their own thread pool
+RENDER_EXECUTOR = os.getenv("RENDER_EXECUTOR", "thread")
+RENDER_EXECUTOR_WORKERS = int(os.getenv("RENDER_EXECUTOR_WORKERS", str(os.cpu_count())))
+FONT_FETCH_WORKERS = int(os.getenv("FONT_FETCH_WORKERS", "8"))
+
+# Render jobs run by "manage.py render_worker": jobs running for longer than
+# the stale timeout are assumed lost with their worker and queued again, up
+# to the maximum number of attempts. Finished jobs are deleted after the
+# retention period.
+RENDER_JOB_STALE_SECONDS = int(os.getenv("RENDER_JOB_STALE_SECONDS", "600"))
+RENDER_JOB_MAX_ATTEMPTS = int(os.getenv("RENDER_JOB_MAX_ATTEMPTS", "3"))
+RENDER_JOB_RETENTION_SECONDS = int(
+    os.getenv("RENDER_JOB_RETENTION_SECONDS", str(7 * 24 * 60 * 60))
+)
+
 # Quick-start development settings - unsuitable for production
 # See https://docs.djangoproject.com/en/5.2/howto/deployment/checklist/
 
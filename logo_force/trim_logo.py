@@ -1,92 +1,92 @@
+import math
 import os
 import re
 import xml.etree.ElementTree as ET
 
+from logo_generator.utils.text_layout import layout_text
+from logo_generator.utils.timing import timed
 from PIL import Image
 
 
-def trim_png_image(input_path, output_path):
+def find_content_bbox(image, alpha_threshold=0):
+    """
+    Find the bounding box of the visible content of an image.
+
+    Pixels whose alpha is at or below ``alpha_threshold`` count as empty,
+    so faint antialiasing fringes can be ignored. The search runs inside
+    Pillow (a lookup table over the alpha band, then ``getbbox``) rather
+    than looping over pixels in Python.
+    """
+    if "A" not in image.getbands() and "transparency" in image.info:
+        image = image.convert("RGBA")
+    if "A" not in image.getbands():
+        # Fully opaque image: everything is content
+        return (0, 0, image.width, image.height)
+
+    # Bounds of every non-transparent pixel, computed without copying the image
+    bbox = image.getbbox(alpha_only=True)
+    if not bbox or alpha_threshold <= 0:
+        return bbox
+
+    # Only the region found above can contain pixels over the threshold
+    lut = [0] * (alpha_threshold + 1) + [255] * (255 - alpha_threshold)
+    inner = image.crop(bbox).getchannel("A").point(lut).getbbox()
+    if not inner:
+        return None
+    left, top = bbox[:2]
+    return (left + inner[0], top + inner[1], left + inner[2], top + inner[3])
+
+
+@timed("trim")
+def crop_to_content(image, padding=20, alpha_threshold=0):
+    """Crop an in-memory image to its visible content plus padding."""
+    bbox = find_content_bbox(image, alpha_threshold)
+    if not bbox:
+        return None
+
+    # Crop image according to bounding box with padding
+    return image.crop(pad_bbox(bbox, padding, image.width, image.height))
+
+
+def pad_bbox(bbox, padding, width, height):
+    """Grow a bounding box by padding, rounded outwards and clamped to the canvas."""
+    left, top, right, bottom = bbox
+    return (
+        max(0, math.floor(left) - padding),
+        max(0, math.floor(top) - padding),
+        min(width, math.ceil(right) + padding),
+        min(height, math.ceil(bottom) + padding),
+    )
+
+
+def trim_png_image(input_path, output_path, padding=20, alpha_threshold=0):
     """Trim transparent space from a PNG image."""
     image = Image.open(input_path)
-    # Convert to RGBA mode if not already
-    if image.mode != "RGBA":
-        image = image.convert("RGBA")
-
-    # Find bounding box of non-transparent content
-    bbox = image.getbbox()
-    if bbox:
-        # Get the bounding box coordinates
-        left, top, right, bottom = bbox
-
-        # Add padding to match SVG padding
-        padding = 20
-        left = max(0, left - padding)
-        top = max(0, top - padding)
-        right = min(image.width, right + padding)
-        bottom = min(image.height, bottom + padding)
+    cropped_image = crop_to_content(image, padding, alpha_threshold)
+    if cropped_image is None:
+        print("No content found to trim in PNG image")
+        return False
 
-        # Crop image according to bounding box with padding
-        cropped_image = image.crop((left, top, right, bottom))
+    # Save the cropped image
+    cropped_image.save(output_path, "PNG")
+    print(f"PNG image has been trimmed and saved at: {output_path}")
+    return True
 
-        # Generate the SVG file if it doesn't exist yet
-        svg_path = input_path.replace(".png", ".svg")
-        svg_trimmed_path = output_path.replace(".png", ".svg")
 
-        if not os.path.exists(svg_trimmed_path) and os.path.exists(svg_path):
-            # Generate the trimmed SVG first
-            trim_svg_image(svg_path, svg_trimmed_path)
+def _load_layout_font(text, font_family, font_size):
+    """Load the font of an SVG text element so its glyphs can be measured."""
+    try:
+        from logo_generator.utils.font_cache import get_font
+        from logo_generator.utils.font_utils import get_font_path
 
-        # Get dimensions from the trimmed SVG file if it exists
-        if os.path.exists(svg_trimmed_path):
-            try:
-                # Try to get SVG dimensions for consistency
-                tree = ET.parse(svg_trimmed_path)
-                root = tree.getroot()
-                svg_width = float(root.get("width", 0))
-                svg_height = float(root.get("height", 0))
-
-                # If SVG dimensions are valid
-                if svg_width > 0 and svg_height > 0:
-                    # Calculate the aspect ratio of the cropped PNG
-                    png_width, png_height = cropped_image.size
-                    png_aspect = png_width / png_height
-
-                    # Calculate the aspect ratio of the SVG
-                    svg_aspect = svg_width / svg_height
-
-                    # Determine the new dimensions to match the SVG aspect ratio
-                    if (
-                        abs(png_aspect - svg_aspect) > 0.1
-                    ):  # If aspect ratios differ significantly
-                        # Use the SVG dimensions directly
-                        new_width = int(svg_width)
-                        new_height = int(svg_height)
-                    else:
-                        # Maintain PNG dimensions but adjust to match SVG aspect ratio
-                        if png_width > png_height:
-                            new_width = png_width
-                            new_height = int(png_width / svg_aspect)
-                        else:
-                            new_height = png_height
-                            new_width = int(png_height * svg_aspect)
-
-                    # Resize PNG to match the calculated dimensions
-                    cropped_image = cropped_image.resize(
-                        (new_width, new_height), Image.LANCZOS
-                    )
-                    print(
-                        f"Resized PNG to match SVG aspect ratio: {new_width}x{new_height}"
-                    )
-            except Exception as e:
-                print(f"Could not match SVG dimensions: {str(e)}")
-
-        # Save the cropped image
-        cropped_image.save(output_path, "PNG")
-        print(f"PNG image has been trimmed and saved at: {output_path}")
-        return True
-    else:
-        print("No content found to trim in PNG image")
-        return False
+        font_path = get_font_path(
+            font_family,
+            int(text.get("font-weight", "400")),
+            text.get("font-style", "normal"),
+        )
+        return get_font(font_path, font_size)
+    except Exception:
+        return None
 
 
 def trim_svg_image(input_path, output_path):
@@ -95,19 +95,145 @@ def trim_svg_image(input_path, output_path):
         # Read the SVG file
         with open(input_path) as f:
             svg_content = f.read()
+    except OSError as e:
+        print(f"Error trimming SVG: {str(e)}")
+        return False
+
+    result = trim_svg_content(svg_content)
+    if result is None:
+        return False
+
+    # Write the updated SVG
+    with open(output_path, "w") as f:
+        f.write(result[0])
+
+    print(f"SVG image has been trimmed and saved at: {output_path}")
+    return True
+
+
+def estimate_text_bbox(
+    text_elements,
+    tspan_elements,
+    letter_spacing,
+    uses_google_fonts,
+    padding,
+    canvas_width,
+    canvas_height,
+):
+    """
+    Estimate the padded box of SVG text whose font couldn't be measured.
+
+    Widths are guessed from the font size, so Google Fonts, which tend to
+    render wider than the estimate, get extra room.
+    """
+    min_x = float("inf")
+    max_x = float("-inf")
+    min_y = float("inf")
+    max_y = float("-inf")
+
+    # Process text elements for y-coordinates
+    for x, y, font_size, _ in text_elements:
+        min_x = min(min_x, x)
+        min_y = min(
+            min_y, y - font_size
+        )  # Text baseline is at y, so subtract font size for top
+        max_y = max(max_y, y + font_size * 0.3)  # Add a bit for descenders
+
+    # Process tspan elements for x-coordinates and width
+    for x, text, font_size, font_family in tspan_elements:
+        min_x = min(min_x, x)
+
+        # Adjust width calculation based on font family
+        # Google Fonts tend to render differently than the default estimation
+        width_multiplier = 0.6  # Default multiplier
+
+        # If using Google Fonts, adjust the multiplier based on the font family
+        if uses_google_fonts:
+            # These are approximate multipliers for common Google Fonts
+            # Adjust based on the specific fonts you're using
+            if font_family and "script" in font_family.lower():
+                width_multiplier = 0.7  # Script fonts tend to be wider
+            elif font_family and (
+                "condensed" in font_family.lower() or "narrow" in font_family.lower()
+            ):
+                width_multiplier = 0.5  # Condensed fonts are narrower
+            elif font_family and (
+                "wide" in font_family.lower() or "expanded" in font_family.lower()
+            ):
+                width_multiplier = 0.8  # Wide fonts are wider
+            else:
+                # For Google Fonts, we need a more generous multiplier
+                width_multiplier = 0.65
+
+        # Calculate the end position of this tspan
+        # Include letter spacing between characters
+        char_width = font_size * width_multiplier
+
+        # For Google Fonts, we need to be more generous with the width calculation
+        if uses_google_fonts:
+            # Add extra width for certain characters that tend to be wider
+            for char in text:
+                if char in "mwWM":
+                    char_width = font_size * 0.9  # Wider characters
+
+        text_width = len(text) * char_width + (len(text) - 1) * letter_spacing
+        end_x = x + text_width
+
+        max_x = max(max_x, end_x)
+
+    # If we couldn't find valid bounds, use defaults
+    if min_x == float("inf") or min_y == float("inf"):
+        min_x = 0
+        min_y = 0
+
+    if max_x == float("-inf") or max_y == float("-inf"):
+        max_x = canvas_width
+        max_y = canvas_height
+
+    # Add extra padding for Google Fonts to account for rendering differences
+    if uses_google_fonts:
+        padding *= 2
+
+    min_x = max(0, min_x - padding)
+    min_y = max(0, min_y - padding)
+    max_x = max_x + padding
+    max_y = max_y + padding
+
+    # For Google Fonts, add extra width to ensure text isn't cut off
+    if uses_google_fonts:
+        # Add 20% extra width for Google Fonts
+        extra_width = (max_x - min_x) * 0.2
+        max_x += extra_width
 
+    return min_x, min_y, max_x, max_y
+
+
+def trim_svg_content(svg_content, padding=20):
+    """
+    Trim SVG markup by calculating the bounding box of all elements.
+
+    Args:
+        svg_content: SVG document as a string
+        padding: Space kept around the content, in user units
+
+    Returns:
+        Tuple (svg_content, width, height) with the updated viewBox,
+        or None if the SVG could not be trimmed
+    """
+    try:
         # Check if the SVG uses Google Fonts
         uses_google_fonts = (
             "@import url(" in svg_content and "fonts.googleapis.com" in svg_content
         )
 
         # Use ElementTree for reliable SVG parsing
-        tree = ET.parse(input_path)
-        root = tree.getroot()
+        root = ET.fromstring(svg_content)
 
         # Get all text elements and their tspans
         text_elements = []
         tspan_elements = []
+        # Exact ink bounds of tspans whose font could be loaded
+        glyph_bounds = []
 
         # Define SVG namespace
         ns = {"svg": "http://www.w3.org/2000/svg"}
@@ -123,20 +249,43 @@ def trim_svg_image(input_path, output_path):
         for text in texts:
             # Get text attributes
             try:
-                x = float(text.get("x", "0"))
+                # Compact SVGs give a list with the position of every character
+                x_values = [float(value) for value in text.get("x", "0").split()]
+                x = x_values[0] if x_values else 0
                 y = float(text.get("y", "0"))
                 font_size = float(text.get("font-size", "12"))
                 font_family = text.get("font-family", "").strip("'\"")
 
-                text_elements.append((x, y, font_size, font_family))
+                # Measure glyphs with the layout engine when the font is available
+                font = _load_layout_font(text, font_family, font_size)
+                if font is None:
+                    text_elements.append((x, y, font_size, font_family))
 
                 # Find all tspans within this text element
-                tspans = text.findall(".//tspan") or []
-
-                for tspan in tspans:
+                tspans = text.findall(".//svg:tspan", ns) or text.findall(".//tspan")
+                glyphs = [(tspan.get("x", "0"), tspan.text or "") for tspan in tspans]
+                if not tspans and text.text:
+                    # Pair characters with positions like SVG, by UTF-16 unit
+                    units = []
+                    for char in text.text:
+                        units.append(char)
+                        if ord(char) > 0xFFFF:
+                            units.append("")
+                    glyphs = [
+                        (char_x, char)
+                        for char_x, char in zip(x_values, units, strict=False)
+                        if char.strip()
+                    ]
+
+                for glyph_x, glyph_text in glyphs:
                     try:
-                        tspan_x = float(tspan.get("x", "0"))
-                        tspan_text = tspan.text or ""
+                        tspan_x = float(glyph_x)
+                        tspan_text = glyph_text
+                        if font is not None:
+                            run = layout_text(font, tspan_text, (tspan_x, y))
+                            if run.bbox:
+                                glyph_bounds.append(run.bbox)
+                            continue
                         tspan_elements.append(
                             (tspan_x, tspan_text, font_size, font_family)
                         )
@@ -146,7 +295,7 @@ def trim_svg_image(input_path, output_path):
                 continue
 
         # If ElementTree didn't find elements, use regex as fallback
-        if not tspan_elements:
+        if not tspan_elements and not glyph_bounds:
             tspan_pattern = r'<tspan x="([^"]*)"[^>]*>([^<]*)</tspan>'
             for match in re.finditer(tspan_pattern, svg_content):
                 try:
@@ -157,12 +306,13 @@ def trim_svg_image(input_path, output_path):
                 except (ValueError, TypeError):
                     continue
 
-        if not text_elements and not tspan_elements:
+        if not text_elements and not tspan_elements and not glyph_bounds:
             print("Could not find any text or tspan elements in the SVG")
-            return False
+            return None
 
         print(
-            f"Found {len(text_elements)} text elements and {len(tspan_elements)} tspan elements"
+            f"Found {len(text_elements)} text elements and "
+            f"{len(tspan_elements) + len(glyph_bounds)} tspan elements"
         )
 
         # Extract letter spacing and font information from the SVG content
@@ -172,137 +322,48 @@ def trim_svg_image(input_path, output_path):
             float(letter_spacing_match.group(1)) if letter_spacing_match else 0
         )
 
-        # Calculate the bounding box
-        min_x = float("inf")
-        max_x = float("-inf")
-        min_y = float("inf")
-        max_y = float("-inf")
-
-        # Process text elements for y-coordinates
-        for x, y, font_size, _ in text_elements:
-            min_x = min(min_x, x)
-            min_y = min(
-                min_y, y - font_size
-            )  # Text baseline is at y, so subtract font size for top
-            max_y = max(max_y, y + font_size * 0.3)  # Add a bit for descenders
-
-        # Extract font information from the config file to get accurate metrics
-        config_path = None
+        # Get dimensions from the SVG tag
         try:
-            import json
-
-            from django.conf import settings
-
-            config_path = settings.DEFAULT_CONFIG_PATH
-        except (ImportError, AttributeError):
-            # If we can't import Django settings, try the default location
-            config_path = os.path.join(
-                os.path.dirname(os.path.dirname(input_path)), "default.json"
+            canvas_width = float(root.get("width", "800"))
+            canvas_height = float(root.get("height", "600"))
+        except (ValueError, TypeError):
+            canvas_width = 800  # Default width
+            canvas_height = 600  # Default height
+
+        boxes = []
+
+        # Measured glyphs give the exact ink box, padded like a PNG trim
+        if glyph_bounds:
+            lefts, tops, rights, bottoms = zip(*glyph_bounds, strict=True)
+            boxes.append(
+                pad_bbox(
+                    (min(lefts), min(tops), max(rights), max(bottoms)),
+                    padding,
+                    canvas_width,
+                    canvas_height,
+                )
             )
 
-        config = None
-        if os.path.exists(config_path):
-            try:
-                with open(config_path) as f:
-                    config = json.load(f)
-            except:
-                pass
-
-        # Process tspan elements for x-coordinates and width
-        for x, text, font_size, font_family in tspan_elements:
-            min_x = min(min_x, x)
-
-            # Adjust width calculation based on font family
-            # Google Fonts tend to render differently than the default estimation
-            width_multiplier = 0.6  # Default multiplier
-
-            # If using Google Fonts, adjust the multiplier based on the font family
-            if uses_google_fonts:
-                # These are approximate multipliers for common Google Fonts
-                # Adjust based on the specific fonts you're using
-                if font_family and "script" in font_family.lower():
-                    width_multiplier = 0.7  # Script fonts tend to be wider
-                elif font_family and (
-                    "condensed" in font_family.lower()
-                    or "narrow" in font_family.lower()
-                ):
-                    width_multiplier = 0.5  # Condensed fonts are narrower
-                elif font_family and (
-                    "wide" in font_family.lower() or "expanded" in font_family.lower()
-                ):
-                    width_multiplier = 0.8  # Wide fonts are wider
-                else:
-                    # For Google Fonts, we need a more generous multiplier
-                    width_multiplier = 0.65
-
-                # If we have the config, use the actual font family information
-                if config:
-                    site_name_font = config.get("site_name", {}).get("font_family", "")
-                    slogan_font = config.get("slogan", {}).get("font_family", "")
-
-                    # Further adjust based on specific fonts in the config
-                    if font_family and (
-                        site_name_font.lower() in font_family.lower()
-                        or font_family.lower() in site_name_font.lower()
-                    ):
-                        # For site name, use a more generous multiplier for Google Fonts
-                        width_multiplier = 0.75
-                        # Add extra for letter spacing
-                        letter_spacing = max(
-                            letter_spacing,
-                            config.get("site_name", {}).get("letter_spacing", 0),
-                        )
-
-            # Calculate the end position of this tspan
-            # Include letter spacing between characters
-            char_width = font_size * width_multiplier
-
-            # For Google Fonts, we need to be more generous with the width calculation
-            if uses_google_fonts:
-                # Add extra width for certain characters that tend to be wider
-                for char in text:
-                    if char in "mwWM":
-                        char_width = font_size * 0.9  # Wider characters
-
-            text_width = len(text) * char_width + (len(text) - 1) * letter_spacing
-            end_x = x + text_width
-
-            max_x = max(max_x, end_x)
-
-        # If we couldn't find valid bounds, use defaults
-        if min_x == float("inf") or min_y == float("inf"):
-            min_x = 0
-            min_y = 0
-
-        if max_x == float("-inf") or max_y == float("-inf"):
-            # Get dimensions from the SVG tag
-            try:
-                width = float(root.get("width", "800"))
-                height = float(root.get("height", "600"))
-                max_x = width
-                max_y = height
-            except (ValueError, TypeError):
-                max_x = 800  # Default width
-                max_y = 600  # Default height
+        # Text whose font couldn't be loaded is estimated from its font size
+        if text_elements or tspan_elements:
+            boxes.append(
+                estimate_text_bbox(
+                    text_elements,
+                    tspan_elements,
+                    letter_spacing,
+                    uses_google_fonts,
+                    padding,
+                    canvas_width,
+                    canvas_height,
+                )
+            )
 
+        min_x = min(box[0] for box in boxes)
+        min_y = min(box[1] for box in boxes)
+        max_x = max(box[2] for box in boxes)
+        max_y = max(box[3] for box in boxes)
         print(f"Calculated bounds: ({min_x}, {min_y}) to ({max_x}, {max_y})")
 
-        # Add extra padding for Google Fonts to account for rendering differences
-        padding = 20
-        if uses_google_fonts:
-            padding = 40  # More generous padding for Google Fonts
-
-        min_x = max(0, min_x - padding)
-        min_y = max(0, min_y - padding)
-        max_x = max_x + padding
-        max_y = max_y + padding
-
-        # For Google Fonts, add extra width to ensure text isn't cut off
-        if uses_google_fonts:
-            # Add 20% extra width for Google Fonts
-            extra_width = (max_x - min_x) * 0.2
-            max_x += extra_width
-
         # Calculate new dimensions
         width = max_x - min_x
         height = max_y - min_y
@@ -335,21 +396,15 @@ def trim_svg_image(input_path, output_path):
                 new_svg_tag = new_svg_tag.replace("<svg", f'<svg viewBox="{viewbox}"')
 
             # Replace the old SVG tag with the new one
-            svg_content = svg_content.replace(svg_tag, new_svg_tag)
-
-            # Write the updated SVG
-            with open(output_path, "w") as f:
-                f.write(svg_content)
-
-            print(f"SVG image has been trimmed and saved at: {output_path}")
-            return True
+            svg_content = svg_content.replace(svg_tag, new_svg_tag, 1)
+            return svg_content, width, height
         else:
             print("Could not find SVG tag to update")
-            return False
+            return None
 
     except Exception as e:
         print(f"Error trimming SVG: {str(e)}")
-        return False
+        return None
 
 
 def trim_image(input_path, output_path=None):
@@ -362,28 +417,7 @@ def trim_image(input_path, output_path=None):
     # Determine file type based on extension
     _, ext = os.path.splitext(input_path.lower())
 
-    # Check if both PNG and SVG versions exist
-    base_path = os.path.splitext(input_path)[0]
-    svg_exists = os.path.exists(f"{base_path}.svg")
-    png_exists = os.path.exists(f"{base_path}.png")
-
-    # If both formats exist, process SVG first to ensure consistent dimensions
-    if ext == ".png" and svg_exists:
-        svg_input = f"{base_path}.svg"
-        svg_output = os.path.splitext(output_path)[0] + ".svg"
-        # Process SVG first
-        trim_svg_image(svg_input, svg_output)
-        # Then process PNG
-        return trim_png_image(input_path, output_path)
-    elif ext == ".svg" and png_exists:
-        # Process SVG
-        result = trim_svg_image(input_path, output_path)
-        # Then process PNG to match SVG dimensions
-        png_input = f"{base_path}.png"
-        png_output = os.path.splitext(output_path)[0] + ".png"
-        trim_png_image(png_input, png_output)
-        return result
-    elif ext == ".png":
+    if ext == ".png":
         return trim_png_image(input_path, output_path)
     elif ext == ".svg":
         return trim_svg_image(input_path, output_path)
@@ -0,0 +1,3 @@
+from logo_generator.cli import main
+
+raise SystemExit(main())
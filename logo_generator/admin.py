@@ -1 +1,11 @@
-# Register your models here.
+from django.contrib import admin
+
+from .models import RenderJob
+
+
+@admin.register(RenderJob)
+class RenderJobAdmin(admin.ModelAdmin):
+    list_display = ("id", "status", "attempts", "created_at", "finished_at")
+    list_filter = ("status",)
+    readonly_fields = ("started_at", "finished_at")
+    exclude = ("result",)
@@ -0,0 +1,354 @@
+import contextlib
+import ctypes
+import io
+import json
+import os
+import platform
+import statistics
+import tempfile
+import time
+import tracemalloc
+
+from django.conf import settings
+
+BENCHMARK_FONTS_DIR = os.path.join(os.path.dirname(__file__), "fonts")
+BASELINE_VERSION = 2
+
+# Medians closer than this to the baseline are never reported, whatever the
+# tolerance: sub-millisecond cases are dominated by timer noise
+MIN_REGRESSION_MS = 0.5
+MIN_REGRESSION_KIB = 64
+
+# Writing "5" to clear_refs resets the peak RSS (VmHWM) to the current RSS
+PROC_CLEAR_REFS = "/proc/self/clear_refs"
+PROC_STATUS = "/proc/self/status"
+
+SHORT_TEXT = "Alex Tran"
+LONG_TEXT = (
+    "Silent midnight hum. Code runs, bug hides in plain sight. "
+    "The build is green, the pager sleeps, and somewhere a cache warms up "
+    "while the coffee goes cold on the desk."
+)
+
+
+def text_layer(text, font_family="Lato", font_size=54, y=250, **overrides):
+    """Return a text layer config using one of the bundled fonts."""
+    layer = {
+        "text": text,
+        "font_family": font_family,
+        "font_weight": 400,
+        "font_style": "normal",
+        "font_size": font_size,
+        "color": "#202020",
+        "position": {"x": 20, "y": y},
+        "letter_spacing": 2,
+        "word_spacing": 8,
+    }
+    layer.update(overrides)
+    return layer
+
+
+def benchmark_config(layers, width=960, height=720, **options):
+    """Return a logo config for the benchmark cases."""
+    config = {
+        "image": {"width": width, "height": height, "background": "transparent"},
+        "layers": layers,
+    }
+    config.update(options)
+    return config
+
+
+SHORT_CONFIG = benchmark_config(
+    [
+        text_layer(SHORT_TEXT),
+        text_layer("Offline benchmark", "Source Code Pro", 18, 290),
+    ]
+)
+LONG_CONFIG = benchmark_config(
+    [
+        text_layer(LONG_TEXT[:60], font_size=32, y=120),
+        text_layer(LONG_TEXT, "Lato", 13, 160, font_style="italic"),
+        text_layer(LONG_TEXT, "Source Code Pro", 11, 190, font_weight=700),
+    ],
+    width=1400,
+)
+LARGE_CONFIG = benchmark_config(
+    [text_layer(LONG_TEXT[:40], font_size=180, y=400 + 420 * i) for i in range(6)],
+    width=6000,
+    height=3000,
+)
+
+
+@contextlib.contextmanager
+def benchmark_fonts():
+    """
+    Serve fonts from a pack of the bundled OFL fonts for the duration.
+
+    Every font the cases use is in the pack, so nothing is downloaded.
+    """
+    from logo_generator.services.render_plan import get_plan_cache
+    from logo_generator.utils.font_cache import get_font_cache
+    from logo_generator.utils.font_pack import build_font_pack, reset_font_pack
+
+    previous_pack_path = getattr(settings, "FONT_PACK_PATH", None)
+    with tempfile.TemporaryDirectory() as pack_dir:
+        pack_path = os.path.join(pack_dir, "benchmark.pack")
+        build_font_pack(BENCHMARK_FONTS_DIR, pack_path)
+        settings.FONT_PACK_PATH = pack_path
+        reset_font_pack()
+        get_plan_cache().clear()
+        get_font_cache().clear()
+        try:
+            yield pack_path
+        finally:
+            settings.FONT_PACK_PATH = previous_pack_path
+            reset_font_pack()
+            get_plan_cache().clear()
+            get_font_cache().clear()
+
+
+def clear_embed_caches():
+    """Drop memoized subsets and @font-face rules so embedding does real work."""
+    from logo_generator.utils.font_embed import get_font_face_cache
+    from logo_generator.utils.font_subset import get_subset_cache
+
+    get_subset_cache().clear()
+    get_font_face_cache().clear()
+
+
+def build_cases(work_dir):
+    """
+    Return the benchmark cases as (name, setup, run) tuples.
+
+    ``setup`` runs before every measured call and isn't timed; it may be
+    None.
+    """
+    from logo_force.trim_logo import trim_image
+    from logo_generator.services.logo_service import (
+        embed_fonts_as_css,
+        generate_png_logo,
+        render_png,
+        render_svg,
+    )
+    from logo_generator.services.render_plan import get_render_plan
+
+    def png(config):
+        return lambda: generate_png_logo(config)
+
+    def svg(config):
+        return lambda: render_svg(config)
+
+    def embed(config, subset, flavor=None):
+        plan = get_render_plan(config)
+        font_list = [
+            (layer.font_family, layer.font_path, layer.text) for layer in plan.layers
+        ]
+        return lambda: embed_fonts_as_css(font_list, subset=subset, flavor=flavor)
+
+    def trim(input_name, output_name):
+        input_path = os.path.join(work_dir, input_name)
+        output_path = os.path.join(work_dir, output_name)
+
+        def run():
+            # trim_image reports progress on stdout
+            with contextlib.redirect_stdout(io.StringIO()):
+                trim_image(input_path, output_path)
+
+        return run
+
+    # Inputs of the trim cases are rendered once up front
+    render_png(LARGE_CONFIG).save(os.path.join(work_dir, "large.png"))
+    render_svg(LONG_CONFIG).save(os.path.join(work_dir, "long.svg"))
+
+    embed_options = {"svg_options": {"embed_fonts": True}}
+    return [
+        ("png/short", None, png(SHORT_CONFIG)),
+        ("png/long", None, png(LONG_CONFIG)),
+        ("png/large-canvas", None, png(LARGE_CONFIG)),
+        ("png/short-bbox", None, png({**SHORT_CONFIG, "canvas": "bbox"})),
+        ("png/large-canvas-bbox", None, png({**LARGE_CONFIG, "canvas": "bbox"})),
+        (
+            "png/encode-trimmed",
+            None,
+            lambda: render_png(SHORT_CONFIG, auto_trim=True),
+        ),
+        *[
+            (
+                f"encode/{encoder}",
+                None,
+                lambda encoder=encoder: render_png(
+                    {**LONG_CONFIG, "encoder": encoder}, auto_trim=True
+                ),
+            )
+            for encoder in ("fast", "small", "webp")
+        ],
+        ("svg/short", None, svg(SHORT_CONFIG)),
+        ("svg/long", None, svg(LONG_CONFIG)),
+        ("svg/short-embed", clear_embed_caches, svg({**SHORT_CONFIG, **embed_options})),
+        ("svg/long-embed", clear_embed_caches, svg({**LONG_CONFIG, **embed_options})),
+        ("embed-css/full", clear_embed_caches, embed(LONG_CONFIG, subset=False)),
+        ("embed-css/subset", clear_embed_caches, embed(LONG_CONFIG, subset=True)),
+        (
+            "embed-css/subset-woff2",
+            clear_embed_caches,
+            embed(LONG_CONFIG, subset=True, flavor="woff2"),
+        ),
+        ("embed-css/cached", None, embed(LONG_CONFIG, subset=True)),
+        ("trim/png-large", None, trim("large.png", "large_trimmed.png")),
+        ("trim/svg-long", None, trim("long.svg", "long_trimmed.svg")),
+    ]
+
+
+def read_rss_kib():
+    """Return the current and peak resident set size of the process, in KiB."""
+    sizes = {}
+    with open(PROC_STATUS) as f:
+        for line in f:
+            key, _, value = line.partition(":")
+            if key in ("VmRSS", "VmHWM"):
+                sizes[key] = int(value.split()[0])
+    return sizes["VmRSS"], sizes["VmHWM"]
+
+
+def measure_rss_growth(run):
+    """
+    Return how far a call pushes resident memory above where it started, in KiB.
+
+    Unlike tracemalloc this sees memory allocated outside the Python heap,
+    such as Pillow's image buffers. The peak is reset before the call, which
+    only Linux supports; elsewhere None is returned.
+    """
+    try:
+        # Hand memory freed by earlier calls back to the OS first, or this
+        # call could reuse it without growing the RSS
+        ctypes.CDLL(None).malloc_trim(0)
+        with open(PROC_CLEAR_REFS, "w") as f:
+            f.write("5")
+        start, _ = read_rss_kib()
+    except (AttributeError, OSError, KeyError):
+        return None
+    run()
+    _, peak = read_rss_kib()
+    return max(peak - start, 0)
+
+
+def measure(setup, run, repeat):
+    """Time ``repeat`` calls after a warm-up call, then measure memory on two more."""
+    if setup:
+        setup()
+    run()
+
+    timings = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        started = time.perf_counter()
+        run()
+        timings.append((time.perf_counter() - started) * 1000)
+
+    if setup:
+        setup()
+    rss_kib = measure_rss_growth(run)
+
+    # Tracing slows calls down and allocates itself, so the Python heap is
+    # measured on a call of its own
+    if setup:
+        setup()
+    tracemalloc.start()
+    try:
+        run()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "median_ms": round(statistics.median(timings), 3),
+        "min_ms": round(min(timings), 3),
+        "mean_ms": round(statistics.fmean(timings), 3),
+        "peak_rss_kib": rss_kib,
+        "py_heap_kib": round(peak / 1024, 1),
+    }
+
+
+def run_suite(repeat=5, pattern=None):
+    """
+    Run every benchmark case whose name contains ``pattern``.
+
+    Returns:
+        Dictionary mapping case names to their timing and memory figures
+    """
+    results = {}
+    with benchmark_fonts(), tempfile.TemporaryDirectory() as work_dir:
+        for name, setup, run in build_cases(work_dir):
+            if pattern and pattern not in name:
+                continue
+            results[name] = measure(setup, run, repeat)
+    return results
+
+
+def save_baseline(path, results):
+    """Write benchmark results as a baseline file."""
+    data = {
+        "version": BASELINE_VERSION,
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "cases": results,
+    }
+    with open(path, "w") as f:
+        json.dump(data, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def load_baseline(path):
+    """Read the cases of a baseline file."""
+    try:
+        with open(path) as f:
+            data = json.load(f)
+    except FileNotFoundError as e:
+        raise Exception(f"Baseline not found: {path}") from e
+    if data.get("version") != BASELINE_VERSION:
+        raise Exception(f"Unsupported baseline version in {path}")
+    return data["cases"]
+
+
+def compare_to_baseline(results, baseline, tolerance=0.2):
+    """
+    Compare results with a baseline.
+
+    A case regresses when its median time, peak RSS growth or Python heap
+    peak exceeds the baseline by more than ``tolerance`` (a fraction). RSS
+    is only compared when both runs could measure it.
+
+    Returns:
+        Dictionary mapping case names to a list of regression messages
+    """
+    regressions = {}
+    for name, result in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+
+        messages = []
+        median, base_median = result["median_ms"], base["median_ms"]
+        if (
+            median > base_median * (1 + tolerance)
+            and median - base_median > MIN_REGRESSION_MS
+        ):
+            messages.append(f"median {base_median:.3f} -> {median:.3f} ms")
+
+        for key, label in (
+            ("peak_rss_kib", "peak RSS"),
+            ("py_heap_kib", "Python heap"),
+        ):
+            peak, base_peak = result[key], base[key]
+            if peak is None or base_peak is None:
+                continue
+            if (
+                peak > base_peak * (1 + tolerance)
+                and peak - base_peak > MIN_REGRESSION_KIB
+            ):
+                messages.append(f"{label} {base_peak:.1f} -> {peak:.1f} KiB")
+
+        if messages:
+            regressions[name] = messages
+    return regressions
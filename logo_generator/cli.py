@@ -0,0 +1,112 @@
+"""
+Standalone command line renderer, run with ``python -m logo_generator``.
+
+It renders like ``manage.py generate_logo`` without setting up Django:
+settings are read from the project settings module, but no apps are loaded
+and no database is opened. Only the standard library is imported up front;
+the renderer, Pillow and Django's settings are imported once the arguments
+have been parsed.
+"""
+
+import argparse
+import importlib
+import os
+import sys
+
+from logo_generator.utils.encoders import ENCODER_PROFILES
+
+DEFAULT_SETTINGS_MODULE = "logo_force.settings"
+
+
+def configure_settings():
+    """Configure Django settings from the project settings module, if needed."""
+    from django.conf import settings
+
+    if not settings.configured:
+        settings_module = os.environ.get(
+            "DJANGO_SETTINGS_MODULE", DEFAULT_SETTINGS_MODULE
+        )
+        settings.configure(default_settings=importlib.import_module(settings_module))
+
+
+def build_parser():
+    """Return the argument parser of the command line renderer."""
+    parser = argparse.ArgumentParser(
+        prog="python -m logo_generator",
+        description="Generate a text logo from a JSON configuration file",
+    )
+    parser.add_argument(
+        "config_file",
+        nargs="?",
+        default=None,
+        help="Path to the JSON configuration file (default: default.json)",
+    )
+    parser.add_argument(
+        "--trim",
+        action="store_true",
+        help="Automatically trim excess transparent space from the output image",
+    )
+    parser.add_argument(
+        "-o",
+        "--output",
+        default=None,
+        help="Path of the output file (default: output.png or output.svg)",
+    )
+    parser.add_argument(
+        "--encoder",
+        choices=ENCODER_PROFILES,
+        default=None,
+        help="Encoder profile for raster output: " + ", ".join(ENCODER_PROFILES),
+    )
+    parser.add_argument(
+        "--timings",
+        action="store_true",
+        help="Print the time spent in each render stage",
+    )
+    parser.add_argument(
+        "--serve",
+        action="store_true",
+        help="Keep running and answer one JSON render request per stdin line",
+    )
+    return parser
+
+
+def main(argv=None):
+    """Render one logo, or serve render requests, and return the exit status."""
+    options = build_parser().parse_args(argv)
+    configure_settings()
+
+    from logo_generator.services.command_service import (
+        config_overrides,
+        render_config_file,
+        render_details,
+    )
+
+    overrides = config_overrides(options.trim, options.encoder)
+    if options.serve:
+        from logo_generator.services.serve_service import serve
+
+        try:
+            failed = serve(sys.stdin, sys.stdout, overrides)
+        except KeyboardInterrupt:
+            return 0
+        if failed:
+            print(f"{failed} request(s) failed", file=sys.stderr)
+        return 0
+
+    from logo_generator.utils.timing import format_timings
+
+    try:
+        result, output_path, export_paths, timings = render_config_file(
+            options.config_file, options.output, overrides
+        )
+        print(f"Logo successfully created: {output_path}")
+        print(render_details(result))
+        for export_path in export_paths:
+            print(f"Export created: {export_path}")
+        if options.timings:
+            print("\n".join(format_timings(timings)))
+    except Exception as e:
+        print(f"Error: {str(e)}", file=sys.stderr)
+        return 1
+    return 0
@@ -0,0 +1,101 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from logo_generator.benchmarks.suite import (
+    compare_to_baseline,
+    load_baseline,
+    run_suite,
+    save_baseline,
+)
+
+
+class Command(BaseCommand):
+    help = "Benchmark the render, SVG, font embedding and trim hot paths offline"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "-n",
+            "--repeat",
+            type=int,
+            default=5,
+            help="Measured calls per case, after one warm-up call (default: 5)",
+        )
+        parser.add_argument(
+            "-k",
+            "--filter",
+            type=str,
+            default=None,
+            help="Only run cases whose name contains this string",
+        )
+        parser.add_argument(
+            "--save-baseline",
+            type=str,
+            default=None,
+            help="Write the results to this baseline file",
+        )
+        parser.add_argument(
+            "--baseline",
+            type=str,
+            default=None,
+            help="Compare the results with this baseline file",
+        )
+        parser.add_argument(
+            "--tolerance",
+            type=float,
+            default=0.2,
+            help="Allowed slowdown or memory growth over the baseline (default: 0.2)",
+        )
+        parser.add_argument(
+            "--json",
+            action="store_true",
+            help="Print the results as JSON instead of a table",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            baseline = load_baseline(options["baseline"]) if options["baseline"] else {}
+        except Exception as e:
+            raise CommandError(str(e)) from e
+
+        results = run_suite(repeat=options["repeat"], pattern=options["filter"])
+        if not results:
+            raise CommandError("No benchmark case matches the filter")
+        regressions = compare_to_baseline(results, baseline, options["tolerance"])
+
+        if options["json"]:
+            self.stdout.write(
+                json.dumps({"cases": results, "regressions": regressions}, indent=2)
+            )
+        else:
+            self.write_table(results, baseline, regressions)
+
+        if options["save_baseline"]:
+            save_baseline(options["save_baseline"], results)
+            self.stdout.write(f"Baseline saved: {options['save_baseline']}")
+
+        if regressions:
+            raise CommandError(f"{len(regressions)} case(s) regressed")
+
+    def write_table(self, results, baseline, regressions):
+        """Print one row per case, with the change against the baseline."""
+        header = (
+            f"{'case':<26}{'median ms':>11}{'min ms':>10}{'RSS KiB':>10}"
+            f"{'heap KiB':>10}{'vs base':>10}"
+        )
+        self.stdout.write(header)
+        self.stdout.write("-" * len(header))
+        for name, result in results.items():
+            change = ""
+            base = baseline.get(name)
+            if base and base["median_ms"]:
+                ratio = result["median_ms"] / base["median_ms"] - 1
+                change = f"{ratio:+.0%}"
+            rss = result["peak_rss_kib"]
+            rss = "n/a" if rss is None else str(rss)
+            row = (
+                f"{name:<26}{result['median_ms']:>11.3f}{result['min_ms']:>10.3f}"
+                f"{rss:>10}{result['py_heap_kib']:>10.1f}{change:>10}"
+            )
+            if name in regressions:
+                row = self.style.ERROR(f"{row}  " + "; ".join(regressions[name]))
+            self.stdout.write(row)
@@ -0,0 +1,38 @@
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from logo_generator.utils.font_pack import build_font_pack
+from logo_generator.utils.font_utils import get_font_cache_dir
+
+
+class Command(BaseCommand):
+    help = "Bundle downloaded fonts into a single indexed, memory-mappable font pack"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--font-dir",
+            type=str,
+            default=None,
+            help="Directory of font files to pack (default: the font cache)",
+        )
+        parser.add_argument(
+            "-o",
+            "--output",
+            type=str,
+            default=None,
+            help="Path of the pack to write (default: FONT_PACK_PATH)",
+        )
+
+    def handle(self, *args, **options):
+        font_dir = options["font_dir"] or get_font_cache_dir()
+        pack_path = options["output"] or settings.FONT_PACK_PATH
+
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(pack_path)), exist_ok=True)
+            count = build_font_pack(font_dir, pack_path)
+            self.stdout.write(
+                self.style.SUCCESS(f"Packed {count} fonts into: {pack_path}")
+            )
+        except Exception as e:
+            self.stdout.write(self.style.ERROR(f"Error: {str(e)}"))
@@ -1,8 +1,18 @@
+import contextlib
+import json
 import os
+import sys
 
 from django.core.management.base import BaseCommand
-from logo_force.trim_logo import trim_image
-from logo_generator.services.logo_service import generate_logo
+from logo_generator.services.batch_service import read_batch_records, run_batch
+from logo_generator.services.command_service import (
+    config_overrides,
+    render_config_file,
+    render_details,
+)
+from logo_generator.services.serve_service import serve
+from logo_generator.utils.encoders import ENCODER_PROFILES
+from logo_generator.utils.timing import format_timings
 
 
 class Command(BaseCommand):
@@ -21,28 +31,126 @@ class Command(BaseCommand):
             action="store_true",
             help="Automatically trim excess transparent space from the output image",
         )
+        parser.add_argument(
+            "-o",
+            "--output",
+            type=str,
+            default=None,
+            help="Path of the output file (default: output.png or output.svg)",
+        )
+        parser.add_argument(
+            "--encoder",
+            choices=ENCODER_PROFILES,
+            default=None,
+            help="Encoder profile for raster output: " + ", ".join(ENCODER_PROFILES),
+        )
+        parser.add_argument(
+            "--timings",
+            action="store_true",
+            help="Print the time spent in each render stage",
+        )
+        parser.add_argument(
+            "--serve",
+            action="store_true",
+            help="Keep running and answer one JSON render request per stdin line",
+        )
+        parser.add_argument(
+            "--batch",
+            type=str,
+            default=None,
+            help="Render every configuration of a JSONL file ('-' for stdin)",
+        )
+        parser.add_argument(
+            "--output-dir",
+            type=str,
+            default="output",
+            help="Directory for batch outputs, one file per record (default: output)",
+        )
+        parser.add_argument(
+            "-j",
+            "--jobs",
+            type=int,
+            default=os.cpu_count() or 1,
+            help="Number of worker processes for batch rendering",
+        )
+        parser.add_argument(
+            "--unordered",
+            action="store_true",
+            help="Report batch results as they complete instead of in input order",
+        )
+        parser.add_argument(
+            "--resume",
+            action="store_true",
+            help="Skip batch records whose output file already exists",
+        )
 
     def handle(self, *args, **options):
-        config_file = options["config_file"]
-        auto_trim = options["trim"]
+        if options["serve"]:
+            return self.handle_serve(options)
+        if options["batch"]:
+            return self.handle_batch(options)
 
         try:
-            output_path = generate_logo(config_file)
+            result, output_path, export_paths, timings = render_config_file(
+                options["config_file"], options["output"], self.overrides(options)
+            )
             self.stdout.write(
                 self.style.SUCCESS(f"Logo successfully created: {output_path}")
             )
+            self.stdout.write(render_details(result))
+            for export_path in export_paths:
+                self.stdout.write(self.style.SUCCESS(f"Export created: {export_path}"))
+            if options["timings"]:
+                self.write_timings(timings)
+        except Exception as e:
+            self.stdout.write(self.style.ERROR(f"Error: {str(e)}"))
 
-            # Trim the image if requested
-            if auto_trim:
-                filename, ext = os.path.splitext(output_path)
-                trimmed_path = f"{filename}_trimmed{ext}"
+    def overrides(self, options):
+        """Return the config settings forced by the command line options."""
+        return config_overrides(options["trim"], options["encoder"])
 
-                if trim_image(output_path, trimmed_path):
-                    self.stdout.write(
-                        self.style.SUCCESS(f"Logo trimmed and saved as: {trimmed_path}")
-                    )
-                else:
-                    self.stdout.write(self.style.WARNING("Could not trim the logo"))
+    def write_timings(self, timings):
+        """Print one line per render stage, then the cache outcomes."""
+        for line in format_timings(timings):
+            self.stdout.write(line)
 
-        except Exception as e:
-            self.stdout.write(self.style.ERROR(f"Error: {str(e)}"))
+    def handle_serve(self, options):
+        """Answer render requests from stdin until it is closed."""
+        failed = serve(sys.stdin, sys.stdout, self.overrides(options))
+        if failed:
+            self.stderr.write(self.style.WARNING(f"{failed} request(s) failed"))
+
+    def handle_batch(self, options):
+        """Render a JSONL batch and print one JSON result line per record."""
+        batch_file = options["batch"]
+        if batch_file == "-":
+            # stdin belongs to the process, so it is left open
+            stream = sys.stdin
+            opened = contextlib.nullcontext(stream)
+        else:
+            stream = opened = open(batch_file)
+
+        overrides = self.overrides(options)
+
+        def records():
+            for line_number, record_id, config, error in read_batch_records(stream):
+                if config is not None:
+                    config.update(overrides)
+                yield line_number, record_id, config, error
+
+        failed = 0
+        with opened:
+            results = run_batch(
+                records(),
+                options["output_dir"],
+                jobs=options["jobs"],
+                ordered=not options["unordered"],
+                resume=options["resume"],
+            )
+            for result in results:
+                if result["error"]:
+                    failed += 1
+                self.stdout.write(json.dumps(result))
+
+        if failed:
+            self.stderr.write(self.style.WARNING(f"{failed} record(s) failed"))
@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand, CommandError
+from logo_generator.services.job_service import run_job_workers
+
+
+class Command(BaseCommand):
+    help = "Run render jobs queued through the jobs API"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "-c",
+            "--concurrency",
+            type=int,
+            default=1,
+            help="Number of jobs rendered at the same time (default: 1)",
+        )
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=1.0,
+            help="Seconds to wait before checking an empty queue again",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Exit once the queue is empty instead of waiting for new jobs",
+        )
+
+    def handle(self, *args, **options):
+        if options["concurrency"] < 1:
+            raise CommandError("--concurrency must be at least 1")
+
+        try:
+            count = run_job_workers(
+                concurrency=options["concurrency"],
+                poll_interval=options["poll_interval"],
+                once=options["once"],
+            )
+        except KeyboardInterrupt:
+            self.stdout.write("Stopped after finishing the running jobs")
+            return
+        self.stdout.write(self.style.SUCCESS(f"Ran {count} render job(s)"))
@@ -1,7 +1,30 @@
 from rest_framework import serializers
 
+from logo_generator.utils.encoders import ENCODER_PROFILES
+
 
 class LogoConfigSerializer(serializers.Serializer):
+    output = serializers.ChoiceField(choices=["png", "svg"], default="png")
+    auto_trim = serializers.BooleanField(default=False)
+    trim_padding = serializers.IntegerField(min_value=0, required=False)
+    trim_alpha_threshold = serializers.IntegerField(
+        min_value=0, max_value=255, required=False
+    )
+    canvas = serializers.ChoiceField(choices=["full", "bbox"], required=False)
+    svg_options = serializers.DictField(required=False)
+    encoder = serializers.ChoiceField(choices=ENCODER_PROFILES, required=False)
+    exports = serializers.ListField(child=serializers.DictField(), required=False)
     image = serializers.DictField()
-    site_name = serializers.DictField()
-    slogan = serializers.DictField()
+    # Either a list of text layers, or the legacy site name and slogan pair
+    layers = serializers.ListField(
+        child=serializers.DictField(), required=False, allow_empty=False
+    )
+    site_name = serializers.DictField(required=False)
+    slogan = serializers.DictField(required=False)
+
+    def validate(self, data):
+        if "layers" not in data and not ("site_name" in data or "slogan" in data):
+            raise serializers.ValidationError(
+                "Provide text 'layers', or 'site_name' and 'slogan'"
+            )
+        return data
@@ -0,0 +1,113 @@
+import asyncio
+import contextvars
+import functools
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from django.conf import settings
+from logo_generator.services.batch_service import init_batch_worker
+from logo_generator.services.logo_service import generate_logo
+from logo_generator.services.render_cache import render_cache_key
+from logo_generator.services.render_plan import config_layers, validate_layer_config
+from logo_generator.utils.font_utils import get_cached_font_path, get_font_path
+
+_executors = {}
+_executors_lock = threading.Lock()
+
+
+def get_render_executor():
+    """
+    Return the executor running CPU-bound renders for async views.
+
+    ``RENDER_EXECUTOR`` selects a "thread" or "process" pool and
+    ``RENDER_EXECUTOR_WORKERS`` bounds its size.
+    """
+    with _executors_lock:
+        executor = _executors.get("render")
+        if executor is None:
+            kind = getattr(settings, "RENDER_EXECUTOR", "thread")
+            workers = getattr(settings, "RENDER_EXECUTOR_WORKERS", None)
+            if kind == "process":
+                executor = ProcessPoolExecutor(
+                    max_workers=workers, initializer=init_batch_worker
+                )
+            elif kind == "thread":
+                executor = ThreadPoolExecutor(
+                    max_workers=workers, thread_name_prefix="logo-render"
+                )
+            else:
+                raise Exception(f"Unknown RENDER_EXECUTOR: {kind}")
+            _executors["render"] = executor
+        return executor
+
+
+def get_font_fetch_executor():
+    """
+    Return the executor for font downloads and font file hashing.
+
+    It is separate from the render executor so a slow Google Fonts fetch
+    never occupies a render slot.
+    """
+    with _executors_lock:
+        executor = _executors.get("font_fetch")
+        if executor is None:
+            executor = ThreadPoolExecutor(
+                max_workers=getattr(settings, "FONT_FETCH_WORKERS", 8),
+                thread_name_prefix="logo-font-fetch",
+            )
+            _executors["font_fetch"] = executor
+        return executor
+
+
+def run_in_context(loop, executor, func, *args):
+    """
+    Run a call on an executor within the caller's context.
+
+    ``run_in_executor`` doesn't carry context variables over, so calls on
+    thread pools are wrapped to keep recording into the request's timings.
+    Process pools can't share them and get the plain call.
+    """
+    if isinstance(executor, ThreadPoolExecutor):
+        return loop.run_in_executor(
+            executor, functools.partial(contextvars.copy_context().run, func, *args)
+        )
+    return loop.run_in_executor(executor, func, *args)
+
+
+async def resolve_fonts_async(config):
+    """Make sure every font of a config is available locally, fetching concurrently."""
+    loop = asyncio.get_running_loop()
+    fetches = []
+    for index, layer_config in enumerate(config_layers(config)):
+        validate_layer_config(index, layer_config)
+        font = (
+            layer_config["font_family"],
+            layer_config["font_weight"],
+            layer_config["font_style"],
+        )
+        # Fonts already on disk are resolved inline without a thread hop
+        if get_cached_font_path(*font) is None:
+            fetches.append(
+                run_in_context(loop, get_font_fetch_executor(), get_font_path, *font)
+            )
+    if fetches:
+        await asyncio.gather(*fetches)
+
+
+async def render_cache_key_async(config):
+    """Compute ``render_cache_key`` once the config's fonts are available."""
+    await resolve_fonts_async(config)
+    loop = asyncio.get_running_loop()
+    return await run_in_context(
+        loop, get_font_fetch_executor(), render_cache_key, config
+    )
+
+
+async def generate_logo_async(config, cache_key=None):
+    """Render a logo on the render executor without blocking the event loop."""
+    if cache_key is None:
+        cache_key = await render_cache_key_async(config)
+    loop = asyncio.get_running_loop()
+    return await run_in_context(
+        loop, get_render_executor(), generate_logo, config, cache_key
+    )
@@ -0,0 +1,189 @@
+import json
+import os
+import re
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from logo_generator.services.logo_service import (
+    CONTENT_TYPE_EXTENSIONS,
+    output_content_type,
+)
+
+# Records submitted to the pool per worker before waiting for results,
+# which keeps memory bounded on very large batches
+IN_FLIGHT_PER_WORKER = 4
+
+
+def read_batch_records(stream):
+    """
+    Parse a JSONL stream of logo configurations.
+
+    Each line is either a configuration object or an object of the form
+    ``{"id": ..., "config": {...}}``. Blank lines are ignored.
+
+    Yields:
+        Tuples (line_number, record_id, config, error)
+    """
+    for line_number, line in enumerate(stream, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            yield line_number, str(line_number), None, f"Invalid JSON: {str(e)}"
+            continue
+
+        if isinstance(record, dict) and "config" in record:
+            record_id = str(record.get("id", line_number))
+            config = record["config"]
+        else:
+            record_id = str(line_number)
+            config = record
+
+        if not isinstance(config, dict):
+            yield line_number, record_id, None, "Configuration must be a JSON object"
+            continue
+        yield line_number, record_id, config, None
+
+
+def batch_output_path(output_dir, record_id, config):
+    """Return the per-record output path of a batch render."""
+    extension = CONTENT_TYPE_EXTENSIONS[output_content_type(config)]
+    # Record ids come from the input, so keep them from escaping output_dir
+    file_name = re.sub(r"[^\w.-]", "_", record_id).lstrip(".") or "_"
+    return os.path.join(output_dir, f"{file_name}{extension}")
+
+
+def init_batch_worker():
+    """Prepare a pool process; fonts and caches then stay warm for its lifetime."""
+    import django
+    from django.apps import apps
+
+    if not apps.ready:
+        django.setup()
+
+
+def render_batch_record(line_number, record_id, config, output_path):
+    """Render one batch record to its output path and describe the outcome."""
+    from logo_generator.services.logo_service import generate_logo
+
+    started = time.perf_counter()
+    result = {"line": line_number, "id": record_id, "output": None, "error": None}
+    try:
+        render = generate_logo(config)
+        # Files are written atomically and the main output comes last, so a
+        # resumed batch never takes a partly written record for a done one
+        if render.exports:
+            result["exports"] = render.save_exports(output_path)
+        render.save(output_path)
+        result["output"] = output_path
+        result["width"] = render.width
+        result["height"] = render.height
+        result["bytes"] = len(render.data)
+        if render.encode_ms is not None:
+            result["encode_ms"] = round(render.encode_ms, 3)
+    except Exception as e:
+        result["error"] = str(e)
+    result["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 3)
+    return result
+
+
+def run_batch(records, output_dir, jobs=1, ordered=True, resume=False):
+    """
+    Render a batch of records, across a process pool when ``jobs`` > 1.
+
+    Args:
+        records: Iterable of tuples from ``read_batch_records``
+        output_dir: Directory receiving one output file per record
+        jobs: Number of worker processes
+        ordered: Yield results in input order instead of completion order
+        resume: Skip records whose output file already exists
+
+    Records whose ids map to the output path of an earlier record fail
+    instead of overwriting it.
+
+    Yields:
+        One result dictionary per record
+    """
+    os.makedirs(output_dir, exist_ok=True)
+
+    def tasks():
+        output_lines = {}
+        for line_number, record_id, config, error in records:
+            if not error:
+                output_path = batch_output_path(output_dir, record_id, config)
+                first_line = output_lines.setdefault(output_path, line_number)
+                if first_line != line_number:
+                    error = (
+                        f"Duplicate record id {record_id!r}: line {first_line} "
+                        f"already renders to {output_path}"
+                    )
+            if error:
+                yield {
+                    "line": line_number,
+                    "id": record_id,
+                    "output": None,
+                    "error": error,
+                    "elapsed_ms": 0,
+                }
+                continue
+            if resume and os.path.exists(output_path):
+                yield {
+                    "line": line_number,
+                    "id": record_id,
+                    "output": output_path,
+                    "error": None,
+                    "skipped": True,
+                }
+                continue
+            yield (line_number, record_id, config, output_path)
+
+    if jobs <= 1:
+        for task in tasks():
+            yield task if isinstance(task, dict) else render_batch_record(*task)
+        return
+
+    max_in_flight = jobs * IN_FLIGHT_PER_WORKER
+    with ProcessPoolExecutor(max_workers=jobs, initializer=init_batch_worker) as pool:
+        if ordered:
+            # Finished entries are held back until everything before them is done
+            pending = deque()
+            for task in tasks():
+                if isinstance(task, dict):
+                    if not pending:
+                        yield task
+                        continue
+                    pending.append(task)
+                else:
+                    pending.append(pool.submit(render_batch_record, *task))
+                while len(pending) >= max_in_flight or (
+                    pending and _is_ready(pending[0])
+                ):
+                    yield _resolve(pending.popleft())
+            while pending:
+                yield _resolve(pending.popleft())
+        else:
+            pending = set()
+            for task in tasks():
+                if isinstance(task, dict):
+                    yield task
+                    continue
+                pending.add(pool.submit(render_batch_record, *task))
+                if len(pending) >= max_in_flight:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        yield future.result()
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+
+
+def _is_ready(entry):
+    return isinstance(entry, dict) or entry.done()
+
+
+def _resolve(entry):
+    return entry if isinstance(entry, dict) else entry.result()
@@ -0,0 +1,47 @@
+from logo_generator.services.logo_service import generate_logo, load_config
+from logo_generator.utils.timing import collect_timings
+
+
+def config_overrides(trim=False, encoder=None):
+    """Return the config settings forced by the --trim and --encoder options."""
+    overrides = {}
+    if trim:
+        overrides["auto_trim"] = True
+    if encoder:
+        overrides["encoder"] = encoder
+    return overrides
+
+
+def render_config_file(config_file=None, output_path=None, overrides=None):
+    """
+    Render a configuration file, then save the logo and its exports.
+
+    Used by ``manage.py generate_logo`` and ``python -m logo_generator``.
+    Without an output path the logo is saved as output.png or output.svg,
+    with a "_trimmed" suffix when it was trimmed.
+
+    Returns:
+        Tuple (result, output_path, export_paths, timings)
+    """
+    config = load_config(config_file)
+    config.update(overrides or {})
+
+    with collect_timings() as timings:
+        result = generate_logo(config)
+
+    if not output_path:
+        suffix = "_trimmed" if result.trimmed else ""
+        output_path = f"output{suffix}{result.extension}"
+    result.save(output_path)
+    export_paths = result.save_exports(output_path)
+    return result, output_path, export_paths, timings
+
+
+def render_details(result):
+    """Describe the size, encode time and encoder of a render in one line."""
+    details = f"{len(result.data)} bytes"
+    if result.encode_ms is not None:
+        details += f", encoded in {result.encode_ms:.1f} ms"
+    if result.encoder:
+        details += f" ({result.encoder})"
+    return details
@@ -0,0 +1,179 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, connection
+from django.db.models import F
+from django.utils import timezone
+from logo_generator.models import RenderJob
+from logo_generator.services.logo_service import generate_logo
+
+# Seconds between two clean-ups of the job table while workers run
+CLEAN_UP_INTERVAL = 60
+
+
+def enqueue_render_job(config):
+    """Queue a render of a validated configuration and return its job."""
+    return RenderJob.objects.create(config=config)
+
+
+def claim_next_job():
+    """
+    Mark the oldest queued job as running and return it, or None.
+
+    The status change is a conditional UPDATE, so when several workers go
+    for the same job only one of them gets it.
+    """
+    while True:
+        job_id = (
+            RenderJob.objects.filter(status=RenderJob.Status.QUEUED)
+            .order_by("created_at")
+            .values_list("id", flat=True)
+            .first()
+        )
+        if job_id is None:
+            return None
+        claimed = RenderJob.objects.filter(
+            id=job_id, status=RenderJob.Status.QUEUED
+        ).update(
+            status=RenderJob.Status.RUNNING,
+            started_at=timezone.now(),
+            attempts=F("attempts") + 1,
+        )
+        if claimed:
+            return RenderJob.objects.get(id=job_id)
+
+
+def run_render_job(job):
+    """
+    Render a claimed job and store its result or error.
+
+    The outcome is stored with a conditional UPDATE that only matches the
+    job while it is still running the attempt that was claimed. A job that
+    ``requeue_stale_jobs`` requeued or failed in the meantime belongs to
+    another attempt, so this one leaves it alone.
+
+    Returns:
+        True if the outcome was stored
+    """
+    try:
+        result = generate_logo(job.config)
+    except Exception as e:
+        outcome = {"status": RenderJob.Status.FAILED, "error": str(e)}
+    else:
+        outcome = {
+            "status": RenderJob.Status.DONE,
+            "cache_key": result.cache_key or "",
+            "width": result.width,
+            "height": result.height,
+        }
+        if result.exports:
+            outcome["result"] = result.archive()
+            outcome["content_type"] = "application/zip"
+            outcome["filename"] = "logo.zip"
+        else:
+            outcome["result"] = result.data
+            outcome["content_type"] = result.content_type
+            outcome["filename"] = f"logo{result.extension}"
+    outcome["finished_at"] = timezone.now()
+
+    stored = RenderJob.objects.filter(
+        id=job.id, status=RenderJob.Status.RUNNING, attempts=job.attempts
+    ).update(**outcome)
+    return bool(stored)
+
+
+def requeue_stale_jobs(stale_after, max_attempts):
+    """
+    Recover jobs left running by a worker that died.
+
+    Jobs running for longer than ``stale_after`` seconds are queued again,
+    unless they already had ``max_attempts`` tries, in which case they fail.
+
+    Returns:
+        Number of jobs recovered
+    """
+    stale = RenderJob.objects.filter(
+        status=RenderJob.Status.RUNNING,
+        started_at__lt=timezone.now() - timedelta(seconds=stale_after),
+    )
+    failed = stale.filter(attempts__gte=max_attempts).update(
+        status=RenderJob.Status.FAILED,
+        error="Render did not finish",
+        finished_at=timezone.now(),
+    )
+    return failed + stale.update(status=RenderJob.Status.QUEUED)
+
+
+def purge_finished_jobs(max_age):
+    """Delete finished jobs older than ``max_age`` seconds, with their results."""
+    deleted, _ = RenderJob.objects.filter(
+        status__in=(RenderJob.Status.DONE, RenderJob.Status.FAILED),
+        finished_at__lt=timezone.now() - timedelta(seconds=max_age),
+    ).delete()
+    return deleted
+
+
+def work_on_jobs(stop, poll_interval=1.0, once=False):
+    """
+    Run queued jobs one at a time until ``stop`` is set.
+
+    Returns:
+        Number of jobs run
+    """
+    count = 0
+    try:
+        while not stop.is_set():
+            job = claim_next_job()
+            if job is None:
+                if once:
+                    break
+                stop.wait(poll_interval)
+                continue
+            run_render_job(job)
+            count += 1
+    finally:
+        # Each thread has its own database connection
+        connection.close()
+    return count
+
+
+def clean_up_jobs():
+    """Recover stale jobs and purge old finished ones, as configured in settings."""
+    close_old_connections()
+    requeue_stale_jobs(
+        getattr(settings, "RENDER_JOB_STALE_SECONDS", 600),
+        getattr(settings, "RENDER_JOB_MAX_ATTEMPTS", 3),
+    )
+    purge_finished_jobs(getattr(settings, "RENDER_JOB_RETENTION_SECONDS", 604800))
+
+
+def run_job_workers(concurrency=1, poll_interval=1.0, once=False, stop=None):
+    """
+    Drain the job queue with ``concurrency`` worker threads.
+
+    Fonts, plans and the render cache are shared by the threads and stay
+    warm between jobs. Workers poll the queue while it is empty, or return
+    with ``once``; meanwhile this thread cleans up the job table every
+    ``CLEAN_UP_INTERVAL`` seconds.
+
+    Returns:
+        Number of jobs run
+    """
+    stop = stop or threading.Event()
+    clean_up_jobs()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        workers = [
+            pool.submit(work_on_jobs, stop, poll_interval, once)
+            for _ in range(concurrency)
+        ]
+        try:
+            while wait(workers, timeout=CLEAN_UP_INTERVAL).not_done:
+                clean_up_jobs()
+        except KeyboardInterrupt:
+            stop.set()
+            raise
+        finally:
+            connection.close()
+        return sum(worker.result() for worker in workers)
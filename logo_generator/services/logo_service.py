@@ -1,320 +1,541 @@
-import base64
+import io
 import json
 import os
+import time
+import zipfile
+from dataclasses import dataclass, replace
 
-import svgwrite
 from django.conf import settings
-from logo_generator.utils.font_utils import get_font_path
-from logo_generator.utils.image_utils import draw_text_with_spacing
-from PIL import Image, ImageDraw, ImageFont
-
+from logo_force.trim_logo import crop_to_content, pad_bbox
+from logo_generator.services.render_cache import get_render_cache, render_cache_key
+from logo_generator.services.render_plan import get_render_plan
+from logo_generator.utils.compression import (
+    COMPRESSIBLE_CONTENT_TYPES,
+    compress_variants,
+)
+from logo_generator.utils.encoders import ENCODER_CONTENT_TYPES, encode_image
+from logo_generator.utils.file_utils import atomic_write
+from logo_generator.utils.font_cache import get_font
+from logo_generator.utils.font_embed import font_face_css
+from logo_generator.utils.font_subset import subsetting_available
+from logo_generator.utils.glyph_atlas import draw_glyph_run
+from logo_generator.utils.svg_writer import (
+    element,
+    style_element,
+    svg_document,
+    text_element,
+)
+from logo_generator.utils.text_layout import union_bbox
+from logo_generator.utils.timing import annotate, timed, timing_span
+from PIL import Image, ImageDraw
+
+CONTENT_TYPE_EXTENSIONS = {
+    "image/png": ".png",
+    "image/svg+xml": ".svg",
+    "image/webp": ".webp",
+    "image/x-icon": ".ico",
+}
+
+
+def output_content_type(config):
+    """Return the content type of the main image a configuration renders to."""
+    if config.get("output", "png").lower() == "svg":
+        return "image/svg+xml"
+    return ENCODER_CONTENT_TYPES.get(config.get("encoder", "default"), "image/png")
+
+
+@dataclass(frozen=True)
+class RenderResult:
+    """An encoded logo held in memory."""
+
+    data: bytes
+    content_type: str
+    width: int
+    height: int
+    trimmed: bool = False
+    cache_key: str | None = None
+    # Additional rasters from config["exports"], and for an export the
+    # suffix added to the output file name
+    exports: tuple = ()
+    suffix: str = ""
+    # Encoder profile of raster output and time spent encoding
+    encoder: str | None = None
+    encode_ms: float | None = None
+    # Precompressed (content coding, bytes) variants of text output
+    encodings: tuple = ()
+
+    @property
+    def etag(self):
+        """Strong HTTP entity tag derived from the render cache key."""
+        return f'"{self.cache_key}"' if self.cache_key else None
+
+    @property
+    def extension(self):
+        """File extension matching the content type."""
+        return CONTENT_TYPE_EXTENSIONS[self.content_type]
+
+    @property
+    def size(self):
+        """Encoded size in bytes, including compressed variants and exports."""
+        return (
+            len(self.data)
+            + sum(len(data) for _, data in self.encodings)
+            + sum(export.size for export in self.exports)
+        )
 
-def generate_logo(config_path=None):
-    """Generate a logo from a JSON configuration file."""
+    def encoded(self, encoding):
+        """Return the data compressed with a content coding, or None."""
+        return dict(self.encodings).get(encoding)
+
+    def save(self, output_path):
+        """Write the encoded logo to a file, atomically."""
+        atomic_write(output_path, self.data)
+        return output_path
+
+    def export_path(self, output_path, export):
+        """Return where an export is saved next to the main output file."""
+        return f"{os.path.splitext(output_path)[0]}{export.suffix}{export.extension}"
+
+    def save_exports(self, output_path):
+        """Write every export next to the main output file and return the paths."""
+        return [
+            export.save(self.export_path(output_path, export))
+            for export in self.exports
+        ]
+
+    def archive(self, name="logo"):
+        """Return the logo and all of its exports together as ZIP bytes."""
+        buffer = io.BytesIO()
+        # Images are already compressed, so they are stored as is
+        with zipfile.ZipFile(buffer, "w", zipfile.ZIP_STORED) as archive:
+            output_path = f"{name}{self.extension}"
+            archive.writestr(output_path, self.data)
+            for export in self.exports:
+                archive.writestr(self.export_path(output_path, export), export.data)
+        return buffer.getvalue()
+
+
+def load_config(config_path=None):
+    """Load a logo configuration from a JSON file."""
     if not config_path:
         config_path = settings.DEFAULT_CONFIG_PATH
 
     try:
         with open(config_path) as f:
-            config = json.load(f)
+            return json.load(f)
     except FileNotFoundError:
         raise Exception(f"File not found: {config_path}")
 
+
+def generate_logo(config=None, cache_key=None):
+    """
+    Generate a logo from a configuration dictionary.
+
+    Identical configurations are served from the render cache.
+
+    Args:
+        config: Logo configuration; the default configuration file is used
+            when omitted
+        cache_key: Precomputed ``render_cache_key(config)``, if available
+
+    Returns:
+        RenderResult with the encoded image
+    """
+    if config is None:
+        config = load_config()
+    elif isinstance(config, str | os.PathLike):
+        raise TypeError(
+            "generate_logo() takes a configuration dictionary, "
+            "use generate_logo(load_config(path)) to render a file"
+        )
+
+    render_cache = get_render_cache()
+    if cache_key is None:
+        cache_key = render_cache_key(config)
+    with timing_span("cache_lookup"):
+        result = render_cache.get(cache_key)
+    annotate("render_cache", "miss" if result is None else "hit")
+    if result is not None:
+        return result
+
     # Get output format from config, default to "png" if not specified
     output_format = config.get("output", "png").lower()
 
     # Check if auto-trim is enabled in the config
     auto_trim = config.get("auto_trim", False)
 
-    output_path = ""
+    # Every backend and export executes the same compiled plan
+    plan = get_render_plan(config)
+
     if output_format == "svg":
-        output_path = generate_svg_logo(config)
+        result = render_svg(config, auto_trim, plan)
     else:
-        output_path = generate_png_logo(config)
+        result = render_png(config, auto_trim, plan)
+
+    exports = ()
+    if config.get("exports"):
+        exports = render_exports(config, plan, (result.width, result.height))
+
+    encodings = ()
+    if result.content_type in COMPRESSIBLE_CONTENT_TYPES:
+        # Compress once here so cache hits are served without compressing
+        with timing_span("compress"):
+            encodings = compress_variants(result.data)
+
+    result = replace(result, cache_key=cache_key, exports=exports, encodings=encodings)
+    with timing_span("cache_store"):
+        render_cache.put(cache_key, result)
+    return result
+
+
+def render_png(config, auto_trim=False, plan=None):
+    """Render and encode a PNG logo, trimming it before encoding if requested."""
+    plan = plan or get_render_plan(config)
+    region = canvas_region(config, plan, auto_trim=auto_trim)
+    image = rasterize_logo(plan, region=region)
+    # A region is already trimmed to the layout, with no pixels to scan
+    trimmed = region is not None
+    if auto_trim and not trimmed:
+        # Crop before encoding so every render is encoded exactly once
+        cropped_image = crop_to_content(
+            image,
+            padding=config.get("trim_padding", 20),
+            alpha_threshold=config.get("trim_alpha_threshold", 0),
+        )
+        if cropped_image is not None:
+            image = cropped_image
+            trimmed = True
+
+    encoder = config.get("encoder", "default")
+    with timing_span("encode"):
+        data, content_type, encode_ms = encode_image(image, encoder)
+    return RenderResult(
+        data=data,
+        content_type=content_type,
+        width=image.width,
+        height=image.height,
+        trimmed=trimmed,
+        encoder=encoder,
+        encode_ms=encode_ms,
+    )
 
-    # Auto-trim if specified in the config
-    if auto_trim:
-        from logo_force.trim_logo import trim_image
 
-        filename, ext = os.path.splitext(output_path)
-        trimmed_path = f"{filename}_trimmed{ext}"
-        if trim_image(output_path, trimmed_path):
-            return trimmed_path
+def render_svg(config, auto_trim=False, plan=None):
+    """
+    Render and serialize an SVG logo, trimming its viewBox if requested.
 
-    return output_path
+    Like a raster's, ``encode_ms`` covers only the serialization of the
+    finished markup; layout and font embedding are timed as "svg_build".
+    """
+    markup, width, height, trimmed = build_svg_markup(config, auto_trim, plan)
+    with timing_span("encode"):
+        started = time.perf_counter()
+        data = markup.encode("utf-8")
+        encode_ms = (time.perf_counter() - started) * 1000
+
+    return RenderResult(
+        data=data,
+        content_type="image/svg+xml",
+        width=width,
+        height=height,
+        trimmed=trimmed,
+        encode_ms=encode_ms,
+    )
 
 
-def generate_png_logo(config):
-    """Generate a PNG logo from the configuration."""
-    # Create image with the specified dimensions
-    image_width = config["image"]["width"]
-    image_height = config["image"]["height"]
-    image = Image.new("RGBA", (image_width, image_height), (0, 0, 0, 0))
-    draw = ImageDraw.Draw(image)
+def content_region(config, plan, scale=1):
+    """
+    Return the padded ink box of the plan's layers at a scale.
 
-    # Set background if not transparent
-    if config["image"]["background"] != "transparent":
-        # Create a background rectangle
-        background_color = config["image"]["background"]
-        # Convert hex color to RGBA
-        if background_color.startswith("#"):
-            r = int(background_color[1:3], 16)
-            g = int(background_color[3:5], 16)
-            b = int(background_color[5:7], 16)
-            background_color = (r, g, b, 255)
-
-        # Fill the entire image with the background color
-        bg_image = Image.new("RGBA", (image_width, image_height), background_color)
-        # Paste the original image on top
-        bg_image.paste(image, (0, 0), image)
-        image = bg_image
-        draw = ImageDraw.Draw(image)
-
-    # Process site name
-    site_name_config = config["site_name"]
-    site_name_font_path = get_font_path(
-        site_name_config["font_family"],
-        site_name_config["font_weight"],
-        site_name_config["font_style"],
+    The box comes from the layout alone, so it is known before anything is
+    drawn. It is grown by the trim padding and clamped to the canvas.
+
+    Returns:
+        Tuple of (left, top, right, bottom) pixels, or None if no layer has ink
+    """
+    bbox = union_bbox([layer.run for layer in plan.layers])
+    if bbox is None:
+        return None
+    return pad_bbox(
+        tuple(value * scale for value in bbox),
+        round(config.get("trim_padding", 20) * scale),
+        round(plan.width * scale),
+        round(plan.height * scale),
     )
 
-    # Create font with the specified size
-    site_name_font_size = site_name_config["font_size"]
-    site_name_font = ImageFont.truetype(site_name_font_path, site_name_font_size)
 
-    # Store font family for adjustment in draw_text_with_spacing
-    site_name_font.font_family = site_name_config["font_family"]
+def canvas_region(config, plan, scale=1, auto_trim=False):
+    """
+    Return the part of the canvas to allocate, or None for the full canvas.
 
-    # Convert hex color to RGBA
-    site_name_color = tuple(
-        int(site_name_config["color"][i : i + 2], 16) for i in (1, 3, 5)
-    ) + (255,)
+    A "bbox" canvas and a trimmed logo only need the content region: the
+    box the SVG viewBox is fitted to, so PNG and SVG trims have the same
+    size. A ``trim_alpha_threshold`` is the exception, as only the pixels
+    tell which edges are too faint to keep.
+    """
+    if config.get("canvas", "full") == "bbox" or (
+        auto_trim and not config.get("trim_alpha_threshold")
+    ):
+        return content_region(config, plan, scale)
+    return None
 
-    # Get position from config
-    site_name_position = (
-        site_name_config["position"]["x"],
-        site_name_config["position"]["y"],
-    )
 
-    # Get text and spacing settings
-    site_name_text = site_name_config["text"]
-    site_name_letter_spacing = site_name_config.get("letter_spacing", 0)
-    site_name_word_spacing = site_name_config.get("word_spacing", 0)
-
-    # Draw site name with proper spacing
-    draw_text_with_spacing(
-        draw,
-        site_name_position,
-        site_name_text,
-        site_name_font,
-        letter_spacing=site_name_letter_spacing,
-        word_spacing=site_name_word_spacing,
-        fill=site_name_color,
-    )
+@timed("rasterize")
+def rasterize_logo(plan, scale=1, region=None):
+    """
+    Rasterize a render plan at a scale factor.
 
-    # Process slogan
-    slogan_config = config["slogan"]
-    slogan_font_path = get_font_path(
-        slogan_config["font_family"],
-        slogan_config["font_weight"],
-        slogan_config["font_style"],
-    )
+    Glyph positions come from the plan's 1x layout, so every scale shows
+    the same composition; only the glyphs are rasterized at the new size.
 
-    # Create font with the specified size
-    slogan_font_size = slogan_config["font_size"]
-    slogan_font = ImageFont.truetype(slogan_font_path, slogan_font_size)
-
-    # Store font family for adjustment in draw_text_with_spacing
-    slogan_font.font_family = slogan_config["font_family"]
-
-    # Convert hex color to RGBA
-    slogan_color = tuple(
-        int(slogan_config["color"][i : i + 2], 16) for i in (1, 3, 5)
-    ) + (255,)
-
-    # Get position from config
-    slogan_position = (slogan_config["position"]["x"], slogan_config["position"]["y"])
-
-    # Get text and spacing settings
-    slogan_text = slogan_config["text"]
-    slogan_letter_spacing = slogan_config.get("letter_spacing", 0)
-    slogan_word_spacing = slogan_config.get("word_spacing", 0)
-
-    # Draw slogan with proper spacing
-    draw_text_with_spacing(
-        draw,
-        slogan_position,
-        slogan_text,
-        slogan_font,
-        letter_spacing=slogan_letter_spacing,
-        word_spacing=slogan_word_spacing,
-        fill=slogan_color,
-    )
+    With a (left, top, right, bottom) region, in pixels at that scale, only
+    that part of the canvas is allocated and drawn, so memory follows the
+    content rather than the nominal canvas size.
+    """
+    if region is None:
+        region = (0, 0, round(plan.width * scale), round(plan.height * scale))
+    left, top, right, bottom = region
+    image = Image.new("RGBA", (right - left, bottom - top), plan.fill or (0, 0, 0, 0))
+    draw = ImageDraw.Draw(image)
 
-    # Save the PNG file
-    output_path = "output.png"
-    image.save(output_path, "PNG")
-    return output_path
+    for layer in plan.layers:
+        if scale == 1:
+            font = get_font(layer.font_path, layer.font_size)
+            run = layer.run
+        elif layer.font_size * scale < 1:
+            # Below one pixel per em FreeType can't load the font; nothing shows
+            continue
+        else:
+            font = get_font(layer.font_path, layer.font_size * scale)
+            run = layer.run.scaled(scale)
+        if left or top:
+            # Whole-pixel offsets keep the glyphs' subpixel phase unchanged
+            run = run.translated(-left, -top)
+        draw_glyph_run(draw, run, font, layer.fill)
 
+    return image
 
-def generate_svg_logo(config):
-    """Generate an SVG logo from the configuration."""
-    image_width = config["image"]["width"]
-    image_height = config["image"]["height"]
 
-    # Create SVG drawing
-    dwg = svgwrite.Drawing("output.svg", size=(image_width, image_height))
+def generate_png_logo(config):
+    """Generate a PNG logo image from the configuration."""
+    plan = get_render_plan(config)
+    return rasterize_logo(plan, region=canvas_region(config, plan))
 
-    # Get font families to include
-    site_name_font_family = config["site_name"]["font_family"]
-    slogan_font_family = config["slogan"]["font_family"]
 
-    # Get SVG options
-    svg_options = config.get("svg_options", {})
-    embed_fonts = svg_options.get("embed_fonts", False)
-
-    if embed_fonts:
-        # Get font paths for embedding
-        site_name_font_path = get_font_path(
-            site_name_font_family,
-            config["site_name"]["font_weight"],
-            config["site_name"]["font_style"],
-        )
+EXPORT_FORMATS = {
+    "png": ("PNG", "image/png"),
+    "webp": ("WEBP", "image/webp"),
+    "ico": ("ICO", "image/x-icon"),
+}
 
-        slogan_font_path = get_font_path(
-            slogan_font_family,
-            config["slogan"]["font_weight"],
-            config["slogan"]["font_style"],
-        )
+# Sizes packed into an ICO export that doesn't list its own
+DEFAULT_ICO_SIZES = (16, 32, 48)
 
-        # Embed fonts as data URIs
-        font_css = embed_fonts_as_css(
-            [
-                (site_name_font_family, site_name_font_path),
-                (slogan_font_family, slogan_font_path),
-            ]
-        )
 
-        style = dwg.style(font_css)
-        dwg.defs.add(style)
-    else:
-        # Add Google Fonts import
-        fonts_to_import = set([site_name_font_family, slogan_font_family])
-        google_fonts_url = create_google_fonts_url(fonts_to_import)
-
-        # Add style that imports Google Fonts
-        style = dwg.style(
-            f"""
-            @import url('{google_fonts_url}');
-        """
-        )
-        dwg.defs.add(style)
+@timed("exports")
+def render_exports(config, plan, base_size):
+    """
+    Render the additional rasters listed in ``config["exports"]``.
 
-    # Set background if not transparent
-    if config["image"]["background"] != "transparent":
-        dwg.add(
-            dwg.rect(
-                insert=(0, 0), size=("100%", "100%"), fill=config["image"]["background"]
+    Each export is either a scale factor (``{"scale": 2}``) or a target
+    size (``{"width": 1200, "height": 630}``), in PNG, WebP or ICO. All of
+    them are rasterized from the same plan, so fonts are resolved and
+    text is laid out only once per logo.
+
+    Args:
+        config: Logo configuration
+        plan: RenderPlan of the logo
+        base_size: (width, height) of the 1x output that sizes are fitted
+            against
+
+    Returns:
+        Tuple of RenderResult, one per export
+    """
+    exports = []
+    for export in config.get("exports", []):
+        output_format = export.get("format", "png").lower()
+        if output_format not in EXPORT_FORMATS:
+            raise Exception(f"Unsupported export format: {output_format}")
+        pil_format, content_type = EXPORT_FORMATS[output_format]
+
+        save_options = {}
+        if output_format == "ico":
+            sizes = export.get("sizes", DEFAULT_ICO_SIZES)
+            images = [
+                fit_export(config, plan, base_size, (size, size)) for size in sizes
+            ]
+            images.sort(key=lambda image: image.width)
+            image = images[-1]
+            save_options["sizes"] = [im.size for im in images]
+            save_options["append_images"] = images[:-1]
+            suffix = ""
+        elif "width" in export or "height" in export:
+            target = (export.get("width"), export.get("height"))
+            image = fit_export(config, plan, base_size, target)
+            suffix = f"-{image.width}x{image.height}"
+        else:
+            scale = export.get("scale", 1)
+            image = raster_export(config, plan, scale)
+            suffix = f"@{scale:g}x"
+
+        encoder = None
+        if output_format == "png":
+            # PNG exports can pick an encoder profile of their own
+            encoder = export.get("encoder", "default")
+            data, content_type, encode_ms = encode_image(image, encoder)
+        else:
+            if output_format == "webp":
+                save_options["quality"] = export.get("quality", 90)
+            started = time.perf_counter()
+            buffer = io.BytesIO()
+            image.save(buffer, pil_format, **save_options)
+            data = buffer.getvalue()
+            encode_ms = (time.perf_counter() - started) * 1000
+
+        exports.append(
+            RenderResult(
+                data=data,
+                content_type=content_type,
+                width=image.width,
+                height=image.height,
+                trimmed=config.get("auto_trim", False),
+                suffix=export.get("suffix", suffix),
+                encoder=encoder,
+                encode_ms=encode_ms,
             )
         )
+    return tuple(exports)
+
+
+def raster_export(config, plan, scale):
+    """Rasterize the plan at a scale, trimming it like the 1x output."""
+    region = canvas_region(config, plan, scale, config.get("auto_trim", False))
+    image = rasterize_logo(plan, scale, region)
+    if config.get("auto_trim", False) and region is None:
+        cropped_image = crop_to_content(
+            image,
+            padding=round(config.get("trim_padding", 20) * scale),
+            alpha_threshold=config.get("trim_alpha_threshold", 0),
+        )
+        if cropped_image is not None:
+            image = cropped_image
+    return image
 
-    # Process site name
-    site_name_config = config["site_name"]
-    site_name_text = site_name_config["text"]
-    site_name_color = site_name_config["color"]
-    site_name_position = (
-        site_name_config["position"]["x"],
-        site_name_config["position"]["y"],
-    )
-    site_name_font_family = site_name_config["font_family"]
-    site_name_font_size = site_name_config["font_size"]
-    site_name_letter_spacing = site_name_config.get("letter_spacing", 0)
-    site_name_font_weight = site_name_config["font_weight"]
-    site_name_font_style = site_name_config["font_style"]
-
-    # Get font metrics from the actual font file
-    site_name_font_path = get_font_path(
-        site_name_font_family,
-        site_name_font_weight,
-        site_name_font_style,
-    )
 
-    # Add site name text with letter spacing
-    site_name = dwg.text(
-        "",
-        insert=site_name_position,
-        fill=site_name_color,
-        font_family=f"'{site_name_font_family}'",  # Quote font family name
-        font_size=site_name_font_size,
-        font_weight=site_name_font_weight,
-        font_style=site_name_font_style,
+def fit_export(config, plan, base_size, target):
+    """
+    Rasterize the plan to fit a target (width, height).
+
+    Either dimension may be None to follow the aspect ratio. When both are
+    given the logo is centered on a canvas of exactly that size.
+    """
+    target_width, target_height = target
+    scales = []
+    if target_width:
+        scales.append(target_width / base_size[0])
+    if target_height:
+        scales.append(target_height / base_size[1])
+    if not scales:
+        raise Exception("Export size needs a width or a height")
+
+    image = raster_export(config, plan, min(scales))
+    if not (target_width and target_height) or image.size == target:
+        return image
+
+    # Rounding can leave the raster a pixel off: letterbox it exactly
+    image.thumbnail(target)
+    canvas = Image.new("RGBA", target, plan.fill or (0, 0, 0, 0))
+    canvas.paste(
+        image,
+        ((target_width - image.width) // 2, (target_height - image.height) // 2),
     )
+    return canvas
 
-    # Handle letter spacing for site name
-    x_offset = 0
-    for char in site_name_text:
-        if char == " ":
-            x_offset += site_name_config.get("word_spacing", site_name_letter_spacing)
-        else:
-            tspan = dwg.tspan(char, x=[site_name_position[0] + x_offset])
-            site_name.add(tspan)
-            # Use the actual font to calculate character width
-            char_width = calculate_char_width(
-                char, site_name_font_path, site_name_font_size
-            )
-            x_offset += char_width + site_name_letter_spacing
 
-    dwg.add(site_name)
+def svg_font_css(config, plan):
+    """Return the stylesheet loading the fonts of an SVG logo."""
+    svg_options = config.get("svg_options", {})
+    if svg_options.get("embed_fonts", False):
+        # Embed fonts as data URIs, subset to the glyphs of each layer
+        return embed_fonts_as_css(
+            [(layer.font_family, layer.font_path, layer.text) for layer in plan.layers],
+            subset=svg_options.get("subset_fonts", True),
+            flavor="woff2" if svg_options.get("font_format") == "woff2" else None,
+        )
 
-    # Process slogan
-    slogan_config = config["slogan"]
-    slogan_text = slogan_config["text"]
-    slogan_color = slogan_config["color"]
-    slogan_position = (
-        slogan_config["position"]["x"],
-        slogan_config["position"]["y"],
-    )
-    slogan_font_family = slogan_config["font_family"]
-    slogan_font_size = slogan_config["font_size"]
-    slogan_letter_spacing = slogan_config.get("letter_spacing", 0)
-    slogan_font_weight = slogan_config["font_weight"]
-    slogan_font_style = slogan_config["font_style"]
-
-    # Get font metrics from the actual font file
-    slogan_font_path = get_font_path(
-        slogan_font_family,
-        slogan_font_weight,
-        slogan_font_style,
-    )
+    # Import the fonts from Google Fonts
+    google_fonts_url = create_google_fonts_url(plan.font_families())
+    return f"@import url('{google_fonts_url}');"
 
-    # Add slogan text with letter spacing
-    slogan = dwg.text(
-        "",
-        insert=slogan_position,
-        fill=slogan_color,
-        font_family=f"'{slogan_font_family}'",  # Quote font family name
-        font_size=slogan_font_size,
-        font_weight=slogan_font_weight,
-        font_style=slogan_font_style,
-    )
 
-    # Handle letter spacing for slogan
-    x_offset = 0
-    for char in slogan_text:
-        if char == " ":
-            x_offset += slogan_config.get("word_spacing", slogan_letter_spacing)
-        else:
-            tspan = dwg.tspan(char, x=[slogan_position[0] + x_offset])
-            slogan.add(tspan)
-            # Use the actual font to calculate character width
-            char_width = calculate_char_width(char, slogan_font_path, slogan_font_size)
-            x_offset += char_width + slogan_letter_spacing
+def svg_view_region(config, plan, auto_trim=False):
+    """
+    Return the (left, top, right, bottom) viewport of a trimmed SVG logo.
+
+    The viewBox is fitted to the glyph bounding boxes produced by the
+    layout, plus ``trim_padding``. Returns None for the full canvas.
+    """
+    if auto_trim or config.get("canvas", "full") == "bbox":
+        return content_region(config, plan)
+    return None
+
+
+def layer_text_attributes(layer):
+    """Return the presentation attributes of a text layer."""
+    return {
+        "fill": layer.color,
+        "font-family": f"'{layer.font_family}'",  # Quote font family name
+        "font-size": layer.font_size,
+        "font-weight": layer.font_weight,
+        "font-style": layer.font_style,
+    }
+
+
+@timed("svg_build")
+def build_svg_markup(config, auto_trim=False, plan=None):
+    """
+    Write an SVG logo as compact markup.
+
+    Each layer is one ``<text>`` element whose ``x`` list places every
+    character where the layout put it. The markup is written directly, with
+    no element tree or validation, and is byte-identical across runs.
+
+    Returns:
+        Tuple of (markup, width, height, trimmed)
+    """
+    if plan is None:
+        plan = get_render_plan(config)
+
+    width, height = plan.width, plan.height
+    children = [style_element(svg_font_css(config, plan))]
+    view_box = None
+    region = svg_view_region(config, plan, auto_trim)
+    if region:
+        left, top, right, bottom = region
+        width, height = right - left, bottom - top
+        view_box = f"{left} {top} {width} {height}"
+
+    if plan.background is not None:
+        # Keep the background covering the trimmed viewport
+        origin = region[:2] if region else (0, 0)
+        children.append(
+            element(
+                "rect",
+                {
+                    "x": origin[0],
+                    "y": origin[1],
+                    "width": "100%",
+                    "height": "100%",
+                    "fill": plan.background,
+                },
+            )
+        )
 
-    dwg.add(slogan)
+    for layer in plan.layers:
+        children.append(text_element(layer.run, layer_text_attributes(layer)))
 
-    # Save the SVG file
-    dwg.save()
-    return "output.svg"
+    markup = svg_document(width, height, children, view_box)
+    return markup, width, height, view_box is not None
 
 
 def create_google_fonts_url(font_families):
@@ -331,53 +552,47 @@ def create_google_fonts_url(font_families):
     return f"{base_url}?{'&'.join(formatted_families)}&display=swap"
 
 
-def calculate_char_width(char, font_path, font_size):
-    """Calculate character width using the actual font file."""
-    try:
-        # Use PIL's ImageFont to get character width
-        font = ImageFont.truetype(font_path, font_size)
-        return font.getlength(char)
-    except Exception:
-        # Fallback to approximation if there's an error
-        return font_size * 0.6  # Rough estimate
-
-
-def embed_fonts_as_css(font_list):
+@timed("font_embed")
+def embed_fonts_as_css(font_list, subset=True, flavor=None):
     """
     Embed fonts as data URIs in CSS.
 
+    Each family is embedded once per document, and its @font-face rule
+    comes from a process-wide cache.
+
     Args:
-        font_list: List of tuples (font_family, font_path)
+        font_list: List of tuples (font_family, font_path, text); when
+            ``text`` is given and ``subset`` is enabled, only the glyphs
+            it uses are embedded
+        subset: Subset fonts to the glyphs of their text when fontTools
+            is available
+        flavor: None to embed TrueType fonts, or "woff2" to compress subsets
 
     Returns:
         CSS string with embedded fonts
     """
     css = []
 
-    for font_family, font_path in font_list:
+    # A family used by several layers gets one @font-face covering all of them
+    fonts = {}
+    for font_family, font_path, text in font_list:
+        key = (font_family, font_path)
+        if key not in fonts:
+            fonts[key] = text
+        elif fonts[key] is None or text is None:
+            # Some layer needs the whole font
+            fonts[key] = None
+        else:
+            fonts[key] += text
+
+    if flavor and not subsetting_available(flavor):
+        flavor = None
+
+    for (font_family, font_path), text in fonts.items():
         try:
-            with open(font_path, "rb") as f:
-                font_data = f.read()
-
-            # Encode font as base64
-            encoded_font = base64.b64encode(font_data).decode("utf-8")
-
-            # Determine font format from file extension
-            font_format = os.path.splitext(font_path)[1].lower().replace(".", "")
-            if font_format == "ttf":
-                font_format = "truetype"
-
-            # Create @font-face rule
-            css.append(
-                f"""
-@font-face {{
-    font-family: '{font_family}';
-    src: url('data:font/{font_format};base64,{encoded_font}') format('{font_format}');
-    font-weight: normal;
-    font-style: normal;
-}}
-            """
-            )
+            if not subset or not subsetting_available(flavor):
+                text = None
+            css.append(font_face_css(font_family, font_path, text, flavor))
         except Exception as e:
             # If embedding fails, log error and continue
             print(f"Error embedding font {font_family}: {str(e)}")
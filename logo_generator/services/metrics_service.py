@@ -0,0 +1,63 @@
+from logo_generator.services.render_cache import get_render_cache
+from logo_generator.services.render_plan import get_plan_cache
+from logo_generator.utils.font_cache import get_font_cache
+from logo_generator.utils.font_embed import get_font_face_cache
+from logo_generator.utils.font_subset import get_subset_cache
+from logo_generator.utils.timing import stage_histograms
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def cache_counters():
+    """Return (cache, hits, misses) for every process-wide cache."""
+    render = get_render_cache().stats()
+    counters = [
+        ("render_memory", render["memory_hits"], None),
+        ("render_disk", render["disk_hits"], None),
+        ("render", render["memory_hits"] + render["disk_hits"], render["misses"]),
+    ]
+    for name, cache in (
+        ("font", get_font_cache()),
+        ("font_subset", get_subset_cache()),
+        ("font_face", get_font_face_cache()),
+        ("render_plan", get_plan_cache()),
+    ):
+        stats = cache.stats()
+        counters.append((name, stats["hits"], stats["misses"]))
+    return counters
+
+
+def render_prometheus():
+    """
+    Render stage histograms and cache counters in the Prometheus text format.
+
+    Figures are per process: with several workers, each one is scraped or
+    aggregated separately.
+    """
+    lines = [
+        "# HELP logo_stage_duration_seconds Time spent in each render stage.",
+        "# TYPE logo_stage_duration_seconds histogram",
+    ]
+    bounds = [f"{bound:g}" for bound in stage_histograms.buckets] + ["+Inf"]
+    for stage, (cumulative, count, total) in sorted(
+        stage_histograms.snapshot().items()
+    ):
+        for bound, bucket_count in zip(bounds, cumulative + [count], strict=True):
+            lines.append(
+                f'logo_stage_duration_seconds_bucket{{stage="{stage}",le="{bound}"}} '
+                f"{bucket_count}"
+            )
+        lines.append(f'logo_stage_duration_seconds_sum{{stage="{stage}"}} {total}')
+        lines.append(f'logo_stage_duration_seconds_count{{stage="{stage}"}} {count}')
+
+    counters = cache_counters()
+    lines.append("# HELP logo_cache_hits_total Lookups served from a cache.")
+    lines.append("# TYPE logo_cache_hits_total counter")
+    for cache, hits, _ in counters:
+        lines.append(f'logo_cache_hits_total{{cache="{cache}"}} {hits}')
+    lines.append("# HELP logo_cache_misses_total Lookups a cache couldn't serve.")
+    lines.append("# TYPE logo_cache_misses_total counter")
+    for cache, _, misses in counters:
+        if misses is not None:
+            lines.append(f'logo_cache_misses_total{{cache="{cache}"}} {misses}')
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,277 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from logo_generator.services.render_plan import config_layers, validate_layer_config
+from logo_generator.utils.file_utils import atomic_write
+from logo_generator.utils.font_utils import font_file_hash, get_font_path
+from logo_generator.utils.timing import timed
+
+# Bump whenever rendering changes so stale renders are never served
+RENDER_CACHE_VERSION = 7
+
+# Minimum number of seconds between two scans of the shared cache directory
+DISK_EVICT_INTERVAL = 30
+
+
+@timed("cache_key")
+def render_cache_key(config):
+    """
+    Compute the content address of a render.
+
+    The key covers the canonicalized configuration and the contents of
+    every font it uses, so replacing a font file invalidates its renders.
+    """
+    font_hashes = []
+    for index, layer_config in enumerate(config_layers(config)):
+        validate_layer_config(index, layer_config)
+        font_path = get_font_path(
+            layer_config["font_family"],
+            layer_config["font_weight"],
+            layer_config["font_style"],
+        )
+        font_hashes.append(font_file_hash(font_path))
+
+    canonical = json.dumps(
+        {"version": RENDER_CACHE_VERSION, "config": config, "fonts": font_hashes},
+        sort_keys=True,
+        separators=(",", ":"),
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class RenderCache:
+    """Two-level LRU cache of render results: in-process memory, then disk."""
+
+    def __init__(self, max_bytes, cache_dir=None, max_disk_bytes=0):
+        self.max_bytes = max_bytes
+        self.cache_dir = cache_dir
+        self.max_disk_bytes = max_disk_bytes
+        self._results = OrderedDict()
+        self._lock = threading.Lock()
+        self._last_disk_scan = 0
+        self.bytes = 0
+        self.disk_bytes = 0
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        """Return the cached result for a key, or None."""
+        with self._lock:
+            result = self._results.get(key)
+            if result is not None:
+                self._results.move_to_end(key)
+                self.memory_hits += 1
+                return result
+
+        result = self._read_disk(key)
+        with self._lock:
+            if result is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+            self._store_memory(key, result)
+        return result
+
+    def put(self, key, result):
+        """Store a result in memory and in the shared cache directory."""
+        with self._lock:
+            self._store_memory(key, result)
+        self._write_disk(key, result)
+
+    def _store_memory(self, key, result):
+        if key in self._results:
+            return
+        if result.size > self.max_bytes:
+            return
+        self._results[key] = result
+        self.bytes += result.size
+        while self.bytes > self.max_bytes:
+            _, evicted = self._results.popitem(last=False)
+            self.bytes -= evicted.size
+
+    def _disk_path(self, key):
+        return os.path.join(self.cache_dir, key[:2], f"{key}.bin")
+
+    def _read_disk(self, key):
+        if not self.cache_dir:
+            return None
+        from logo_generator.services.logo_service import RenderResult
+
+        path = self._disk_path(key)
+        try:
+            with open(path, "rb") as f:
+                header = json.loads(f.readline())
+                data = f.read()
+            # Touch the entry so disk eviction sees it as recently used
+            os.utime(path)
+        except (OSError, ValueError):
+            return None
+
+        # Compressed variants and then export blobs follow the main image,
+        # in header order
+        length = header.pop("length", len(data))
+        offset = length
+        encodings = []
+        for encoding, encoding_length in header.pop("encodings", []):
+            encodings.append((encoding, data[offset : offset + encoding_length]))
+            offset += encoding_length
+        exports = []
+        for export in header.pop("exports", []):
+            export_length = export.pop("length")
+            exports.append(
+                RenderResult(data=data[offset : offset + export_length], **export)
+            )
+            offset += export_length
+        return RenderResult(
+            data=data[:length],
+            cache_key=key,
+            exports=tuple(exports),
+            encodings=tuple(encodings),
+            **header,
+        )
+
+    def _write_disk(self, key, result):
+        if not self.cache_dir:
+            return
+        path = self._disk_path(key)
+        header = {
+            "content_type": result.content_type,
+            "width": result.width,
+            "height": result.height,
+            "trimmed": result.trimmed,
+            "encoder": result.encoder,
+            "encode_ms": result.encode_ms,
+            "length": len(result.data),
+            "encodings": [
+                [encoding, len(encoded)] for encoding, encoded in result.encodings
+            ],
+            "exports": [
+                {
+                    "content_type": export.content_type,
+                    "width": export.width,
+                    "height": export.height,
+                    "trimmed": export.trimmed,
+                    "suffix": export.suffix,
+                    "encoder": export.encoder,
+                    "encode_ms": export.encode_ms,
+                    "length": len(export.data),
+                }
+                for export in result.exports
+            ],
+        }
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Written atomically so other workers never see a partially
+            # written entry
+            atomic_write(
+                path,
+                [
+                    json.dumps(header).encode("utf-8") + b"\n",
+                    result.data,
+                    *(encoded for _, encoded in result.encodings),
+                    *(export.data for export in result.exports),
+                ],
+            )
+        except OSError as e:
+            print(f"Error writing render cache entry {key}: {str(e)}")
+            return
+
+        with self._lock:
+            self.disk_bytes += result.size
+            due = time.monotonic() - self._last_disk_scan > DISK_EVICT_INTERVAL
+        if self.disk_bytes > self.max_disk_bytes or due:
+            self._evict_disk()
+
+    def _evict_disk(self):
+        """Delete the least recently used entries until the directory fits."""
+        entries = []
+        total = 0
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+                total += stat.st_size
+
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_disk_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+
+        with self._lock:
+            self.disk_bytes = total
+            self._last_disk_scan = time.monotonic()
+
+    def clear(self):
+        """Empty the in-process cache and reset the counters."""
+        with self._lock:
+            self._results.clear()
+            self.bytes = 0
+            self.memory_hits = 0
+            self.disk_hits = 0
+            self.misses = 0
+
+    def stats(self):
+        """
+        Return hit counters and sizes as a dictionary.
+
+        Reading stats has no side effects. ``disk_bytes`` is the size of the
+        shared directory as of this process's last scan, which happens in
+        the write path, plus what it wrote since.
+        """
+        with self._lock:
+            lookups = self.memory_hits + self.disk_hits + self.misses
+            hits = self.memory_hits + self.disk_hits
+            return {
+                "entries": len(self._results),
+                "bytes": self.bytes,
+                "disk_bytes": self.disk_bytes,
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_ratio": hits / lookups if lookups else 0.0,
+            }
+
+
+_render_cache = None
+_render_cache_lock = threading.Lock()
+
+
+def get_render_cache():
+    """Return the process-wide render cache, creating it from settings on first use."""
+    global _render_cache
+    if _render_cache is None:
+        with _render_cache_lock:
+            if _render_cache is None:
+                _render_cache = RenderCache(
+                    max_bytes=getattr(
+                        settings, "RENDER_CACHE_MAX_BYTES", 32 * 1024 * 1024
+                    ),
+                    cache_dir=getattr(settings, "RENDER_CACHE_DIR", None),
+                    max_disk_bytes=getattr(
+                        settings, "RENDER_CACHE_DISK_MAX_BYTES", 512 * 1024 * 1024
+                    ),
+                )
+    return _render_cache
+
+
+def reset_render_cache():
+    """Forget the process-wide render cache so the next use recreates it."""
+    global _render_cache
+    with _render_cache_lock:
+        _render_cache = None
@@ -0,0 +1,238 @@
+import json
+import threading
+from dataclasses import dataclass, replace
+
+from django.conf import settings
+from logo_generator.utils.font_cache import get_font
+from logo_generator.utils.font_utils import get_font_path
+from logo_generator.utils.lru_cache import SizedLRUCache
+from logo_generator.utils.text_layout import TextRun, layout_text
+from logo_generator.utils.timing import timed
+
+# Text layers of configs written before "layers" lists, in drawing order
+TEXT_LAYERS = ("site_name", "slogan")
+
+REQUIRED_LAYER_KEYS = (
+    "text",
+    "font_family",
+    "font_weight",
+    "font_style",
+    "font_size",
+    "color",
+    "position",
+)
+
+
+def config_layers(config):
+    """
+    Return the text layer configurations of a config, in drawing order.
+
+    Layers come from a "layers" list, or from the legacy "site_name" and
+    "slogan" entries.
+    """
+    if "layers" in config:
+        return list(config["layers"])
+    return [config[name] for name in TEXT_LAYERS if name in config]
+
+
+def parse_color(color):
+    """Convert a "#rrggbb" color to an RGBA tuple; other values are left as is."""
+    if isinstance(color, str) and color.startswith("#"):
+        return tuple(int(color[i : i + 2], 16) for i in (1, 3, 5)) + (255,)
+    return color
+
+
+@dataclass(frozen=True, slots=True)
+class LayerPlan:
+    """A validated text layer with its font resolved and its text laid out."""
+
+    text: str
+    font_family: str
+    font_weight: int
+    font_style: str
+    font_size: float
+    font_path: str
+    color: str
+    fill: tuple
+    x: float
+    y: float
+    letter_spacing: float
+    word_spacing: float
+    run: TextRun
+
+    def with_text(self, text):
+        """Return the layer showing another text, reusing font and style."""
+        if text == self.text:
+            return self
+        return replace(self, text=text, run=self.layout(text))
+
+    @timed("layout")
+    def layout(self, text):
+        """Lay out a text with the font and spacing of the layer."""
+        return layout_text(
+            get_font(self.font_path, self.font_size),
+            text,
+            (self.x, self.y),
+            self.letter_spacing,
+            self.word_spacing,
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class RenderPlan:
+    """
+    Immutable, backend-independent description of a logo.
+
+    Compiled once from a config, it is executed by both the PNG and the SVG
+    renderer.
+    """
+
+    width: int
+    height: int
+    background: str | None
+    fill: object
+    layers: tuple
+
+    def with_texts(self, texts):
+        """Return the plan with new layer texts, laying out only what changed."""
+        if len(texts) != len(self.layers):
+            raise Exception(
+                f"Expected {len(self.layers)} layer texts, got {len(texts)}"
+            )
+        layers = tuple(
+            layer.with_text(text)
+            for layer, text in zip(self.layers, texts, strict=True)
+        )
+        return replace(self, layers=layers)
+
+    def font_families(self):
+        """Return the font families of the plan once each, in layer order."""
+        return list(dict.fromkeys(layer.font_family for layer in self.layers))
+
+
+def validate_layer_config(index, layer_config):
+    """Raise a descriptive error if a text layer config is incomplete."""
+    if not isinstance(layer_config, dict):
+        raise Exception(f"Layer {index} must be an object")
+    for key in REQUIRED_LAYER_KEYS:
+        if key not in layer_config:
+            raise Exception(f"Layer {index} is missing '{key}'")
+
+
+def compile_layer(index, layer_config):
+    """Validate one text layer config and build its plan."""
+    validate_layer_config(index, layer_config)
+    position = layer_config["position"]
+    font_path = get_font_path(
+        layer_config["font_family"],
+        layer_config["font_weight"],
+        layer_config["font_style"],
+    )
+    layer = LayerPlan(
+        text=layer_config["text"],
+        font_family=layer_config["font_family"],
+        font_weight=layer_config["font_weight"],
+        font_style=layer_config["font_style"],
+        font_size=layer_config["font_size"],
+        font_path=font_path,
+        color=layer_config["color"],
+        fill=parse_color(layer_config["color"]),
+        x=position["x"],
+        y=position["y"],
+        letter_spacing=layer_config.get("letter_spacing", 0),
+        word_spacing=layer_config.get("word_spacing", 0),
+        run=None,
+    )
+    return replace(layer, run=layer.layout(layer.text))
+
+
+def compile_render_plan(config):
+    """
+    Validate a config and compile it into a render plan.
+
+    Fonts are resolved, colors parsed and every layer laid out here, so
+    the renderers only execute the plan.
+    """
+    image = config.get("image")
+    if not isinstance(image, dict):
+        raise Exception("Missing 'image' settings")
+    for key in ("width", "height", "background"):
+        if key not in image:
+            raise Exception(f"Image settings are missing '{key}'")
+
+    layers = tuple(
+        compile_layer(index, layer_config)
+        for index, layer_config in enumerate(config_layers(config))
+    )
+    if not layers:
+        raise Exception("Config has no text layers")
+
+    background = image["background"]
+    if background == "transparent":
+        background = None
+    return RenderPlan(
+        width=image["width"],
+        height=image["height"],
+        background=background,
+        fill=parse_color(background) if background else None,
+        layers=layers,
+    )
+
+
+def render_plan_template_key(config):
+    """Return a key identifying a config apart from the texts of its layers."""
+    layers = [
+        {key: value for key, value in layer.items() if key != "text"}
+        for layer in config_layers(config)
+    ]
+    return json.dumps(
+        {"image": config.get("image"), "layers": layers},
+        sort_keys=True,
+        separators=(",", ":"),
+    )
+
+
+_plan_cache = None
+_plan_cache_lock = threading.Lock()
+
+
+def get_plan_cache():
+    """Return the process-wide plan cache, creating it from settings on first use."""
+    global _plan_cache
+    if _plan_cache is None:
+        with _plan_cache_lock:
+            if _plan_cache is None:
+                _plan_cache = SizedLRUCache(
+                    getattr(settings, "RENDER_PLAN_CACHE_MAX_ENTRIES", 256),
+                    sizeof=lambda plan: 1,
+                )
+    return _plan_cache
+
+
+@timed("plan")
+def get_render_plan(config):
+    """
+    Return the render plan of a config, reusing a compiled one when possible.
+
+    Configs that differ only in the texts of their layers share a compiled
+    plan; only the changed texts are laid out again.
+    """
+    try:
+        key = render_plan_template_key(config)
+    except (TypeError, ValueError, AttributeError):
+        # Malformed configs get the detailed errors of the compiler
+        return compile_render_plan(config)
+
+    plan_cache = get_plan_cache()
+    plan = plan_cache.get(key)
+    if plan is None:
+        plan = compile_render_plan(config)
+        plan_cache.put(key, plan)
+        return plan
+
+    texts = []
+    for index, layer_config in enumerate(config_layers(config)):
+        if "text" not in layer_config:
+            raise Exception(f"Layer {index} is missing 'text'")
+        texts.append(layer_config["text"])
+    return plan.with_texts(texts)
@@ -0,0 +1,124 @@
+import base64
+import contextlib
+import json
+import sys
+import time
+
+from logo_generator.services.logo_service import generate_logo
+from logo_generator.utils.timing import collect_timings
+
+
+def parse_serve_request(line_number, line):
+    """
+    Parse one request line of the render worker protocol.
+
+    A request is either a configuration object or an object of the form
+    ``{"id": ..., "config": {...}, "output": "path"}``. Without an output
+    path the encoded image is returned inline.
+
+    Returns:
+        Tuple (request_id, config, output_path, error)
+    """
+    try:
+        request = json.loads(line)
+    except ValueError as e:
+        return str(line_number), None, None, f"Invalid JSON: {str(e)}"
+
+    if isinstance(request, dict) and "config" in request:
+        request_id = str(request.get("id", line_number))
+        config = request["config"]
+        output_path = request.get("output")
+    else:
+        request_id = str(line_number)
+        config = request
+        output_path = None
+
+    if not isinstance(config, dict):
+        return request_id, None, None, "Configuration must be a JSON object"
+    if output_path is not None and not isinstance(output_path, str):
+        return request_id, None, None, "Output must be a file path"
+    return request_id, config, output_path, None
+
+
+def describe_render(render, output_path):
+    """Describe a render, saving it when an output path is given."""
+    record = {
+        "content_type": render.content_type,
+        "width": render.width,
+        "height": render.height,
+        "bytes": len(render.data),
+    }
+    if render.encode_ms is not None:
+        record["encode_ms"] = round(render.encode_ms, 3)
+
+    if output_path:
+        record["output"] = render.save(output_path)
+        if render.exports:
+            record["exports"] = render.save_exports(output_path)
+        return record
+
+    record["data"] = base64.b64encode(render.data).decode("ascii")
+    if render.exports:
+        record["exports"] = [
+            {
+                "suffix": export.suffix,
+                "content_type": export.content_type,
+                "width": export.width,
+                "height": export.height,
+                "data": base64.b64encode(export.data).decode("ascii"),
+            }
+            for export in render.exports
+        ]
+    return record
+
+
+def serve_request(line_number, line, overrides=None):
+    """Render one request line and return its result record."""
+    started = time.perf_counter()
+    request_id, config, output_path, error = parse_serve_request(line_number, line)
+    record = {"line": line_number, "id": request_id, "error": error}
+    if config is not None:
+        try:
+            with collect_timings() as timings:
+                render = generate_logo({**config, **(overrides or {})})
+            record.update(describe_render(render, output_path))
+            record["timings"] = {
+                name: round(total * 1000, 3)
+                for name, (_, total) in timings.totals().items()
+            }
+            record.update(timings.notes)
+        except Exception as e:
+            record["error"] = str(e)
+    record["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 3)
+    return record
+
+
+def serve(input_stream, output_stream, overrides=None):
+    """
+    Answer render requests read line by line until the input ends.
+
+    One JSON result record is written and flushed per request line, in
+    order. The process keeps its fonts, plans and render cache warm
+    between requests. Anything the renderer prints goes to stderr, so the
+    output stream only ever carries result records.
+
+    Args:
+        input_stream: Text stream of JSON request lines
+        output_stream: Text stream receiving JSON result lines
+        overrides: Settings applied on top of every configuration
+
+    Returns:
+        Number of requests that failed
+    """
+    failed = 0
+    for line_number, line in enumerate(input_stream, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        with contextlib.redirect_stdout(sys.stderr):
+            record = serve_request(line_number, line, overrides)
+        if record["error"]:
+            failed += 1
+        output_stream.write(json.dumps(record) + "\n")
+        output_stream.flush()
+    return failed
@@ -1 +1,718 @@
-# Create your tests here.
+import base64
+import contextlib
+import gzip
+import io
+import itertools
+import json
+import math
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import threading
+import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from unittest import mock
+
+from django.conf import settings
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+from logo_force.trim_logo import trim_svg_content
+from PIL import Image, ImageDraw, ImageFont
+
+from logo_generator.benchmarks.suite import (
+    BENCHMARK_FONTS_DIR,
+    LONG_TEXT,
+    SHORT_CONFIG,
+    SHORT_TEXT,
+    benchmark_config,
+    benchmark_fonts,
+    text_layer,
+)
+from logo_generator.models import RenderJob
+from logo_generator.services.batch_service import read_batch_records, run_batch
+from logo_generator.services.job_service import (
+    claim_next_job,
+    enqueue_render_job,
+    requeue_stale_jobs,
+    run_render_job,
+)
+from logo_generator.services.logo_service import RenderResult, generate_logo
+from logo_generator.services.render_cache import (
+    RenderCache,
+    get_render_cache,
+    reset_render_cache,
+)
+from logo_generator.services.serve_service import serve
+from logo_generator.utils.compression import negotiate_encoding
+from logo_generator.utils.encoders import encode_image, to_palette
+from logo_generator.utils.file_utils import atomic_write
+from logo_generator.utils.font_pack import PACKED_FONT_PREFIX, open_font_file
+from logo_generator.utils.glyph_atlas import draw_glyph_run
+from logo_generator.utils.single_flight import SingleFlight
+from logo_generator.utils.text_layout import layout_text
+
+# Time allowed for importing the standalone CLI, which happens before any
+# argument is parsed. Interpreter startup isn't included.
+CLI_IMPORT_BUDGET_MS = 50
+
+
+def import_in_fresh_interpreter(statement):
+    """Run import statements in a new interpreter; return (ms, top-level modules)."""
+    code = (
+        "import json, sys, time\n"
+        "started = time.perf_counter()\n"
+        f"{statement}\n"
+        "elapsed = (time.perf_counter() - started) * 1000\n"
+        "print(json.dumps([elapsed, sorted(sys.modules)]))\n"
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", code],
+        check=True,
+        capture_output=True,
+        text=True,
+        cwd=settings.BASE_DIR,
+    ).stdout
+    elapsed, modules = json.loads(output)
+    return elapsed, {name.partition(".")[0] for name in modules}
+
+
+class CliImportTimeTests(SimpleTestCase):
+    def test_cli_import_is_within_budget(self):
+        # The fastest of a few runs, so a busy machine doesn't fail the test
+        elapsed = min(
+            import_in_fresh_interpreter("import logo_generator.cli")[0]
+            for _ in range(3)
+        )
+        self.assertLess(elapsed, CLI_IMPORT_BUDGET_MS)
+
+    def test_cli_import_defers_renderer_dependencies(self):
+        _, modules = import_in_fresh_interpreter("import logo_generator.cli")
+        for name in ("django", "PIL", "requests", "fontTools"):
+            self.assertNotIn(name, modules)
+
+    def test_renderer_defers_optional_dependencies(self):
+        # Only font downloads and font subsetting need these
+        _, modules = import_in_fresh_interpreter(
+            "from logo_generator.cli import configure_settings\n"
+            "configure_settings()\n"
+            "import logo_generator.services.logo_service"
+        )
+        for name in ("requests", "fontTools"):
+            self.assertNotIn(name, modules)
+
+
+class ConcurrentLayoutTests(SimpleTestCase):
+    def test_threads_share_advance_tables_of_one_font(self):
+        threads = 8
+        # Switch threads as often as possible to interleave the measurements
+        switch_interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+        try:
+            with benchmark_fonts(), ThreadPoolExecutor(threads) as pool:
+                for _ in range(20):
+                    # A fresh font comes with empty advance tables
+                    font = ImageFont.truetype(
+                        open_font_file(PACKED_FONT_PREFIX + "Lato_regular.ttf"), 40
+                    )
+                    barrier = threading.Barrier(threads)
+
+                    def layout(font=font, barrier=barrier):
+                        barrier.wait()
+                        return layout_text(font, LONG_TEXT, (0, 100))
+
+                    runs = [pool.submit(layout) for _ in range(threads)]
+                    runs = {run.result() for run in runs}
+                    self.assertEqual(len(runs), 1)
+        finally:
+            sys.setswitchinterval(switch_interval)
+
+
+class GlyphAtlasTests(SimpleTestCase):
+    def test_atlas_draws_the_pixels_of_draw_text(self):
+        fonts = sorted(
+            name for name in os.listdir(BENCHMARK_FONTS_DIR) if name.endswith(".ttf")
+        )
+        for name, size in itertools.product(fonts, (11.5, 40, 63.3)):
+            with self.subTest(font=name, size=size):
+                font = ImageFont.truetype(os.path.join(BENCHMARK_FONTS_DIR, name), size)
+                run = layout_text(font, LONG_TEXT, (10.3, 80.7), letter_spacing=1.37)
+                fill = (32, 64, 200, 255)
+
+                canvas_size = (math.ceil(run.bbox[2]) + 1, math.ceil(run.bbox[3]) + 1)
+                atlas = Image.new("RGBA", canvas_size)
+                draw_glyph_run(ImageDraw.Draw(atlas), run, font, fill)
+                expected = Image.new("RGBA", canvas_size)
+                draw = ImageDraw.Draw(expected)
+                for char, x in run.glyphs():
+                    draw.text((x, run.y), char, font=font, fill=fill, anchor="ls")
+
+                self.assertEqual(atlas.tobytes(), expected.tobytes())
+
+
+def drawn_logo(background, fill="#202020"):
+    """Return an RGBA image of text drawn with a bundled font."""
+    font = ImageFont.truetype(os.path.join(BENCHMARK_FONTS_DIR, "Lato_regular.ttf"), 54)
+    image = Image.new("RGBA", (600, 120), background)
+    ImageDraw.Draw(image).text((20, 80), SHORT_TEXT, font=font, fill=fill, anchor="ls")
+    return image
+
+
+class EncoderTests(SimpleTestCase):
+    def assert_small_round_trip(self, image):
+        data, content_type, _ = encode_image(image, "small")
+        self.assertEqual(content_type, "image/png")
+        with Image.open(io.BytesIO(data)) as decoded:
+            self.assertEqual(decoded.mode, "P")
+            self.assertEqual(decoded.convert("RGBA").tobytes(), image.tobytes())
+
+    def test_small_profile_keeps_the_pixels_of_a_transparent_logo(self):
+        self.assert_small_round_trip(drawn_logo((0, 0, 0, 0)))
+
+    def test_small_profile_keeps_the_pixels_when_no_band_separates_colours(self):
+        # Antialiased text on an opaque background repeats values in every band
+        image = drawn_logo("#ffeedd")
+        for band in image.getbands():
+            values = image.getchannel(band).getcolors(256)
+            self.assertLess(len(values), len(image.getcolors(256)))
+        self.assert_small_round_trip(image)
+
+    def test_images_with_many_colours_are_not_converted(self):
+        image = Image.linear_gradient("L").resize((256, 256)).convert("RGBA")
+        image.putalpha(Image.linear_gradient("L").rotate(90))
+        self.assertIsNone(to_palette(image))
+
+
+class RenderTestMixin:
+    """Render with the bundled fonts, caching into a temporary directory."""
+
+    def setUp(self):
+        super().setUp()
+        self.cache_dir = self.enterContext(tempfile.TemporaryDirectory())
+        self.enterContext(override_settings(RENDER_CACHE_DIR=self.cache_dir))
+        self.enterContext(benchmark_fonts())
+        reset_render_cache()
+        self.addCleanup(reset_render_cache)
+
+    def post_config(self, config, **headers):
+        return self.client.post(
+            "/api/generate-logo/", config, content_type="application/json", **headers
+        )
+
+
+def cached_result(size):
+    """Return a render result of ``size`` bytes for cache tests."""
+    return RenderResult(data=b"\0" * size, content_type="image/png", width=1, height=1)
+
+
+def file_mode(path):
+    """Return the permission bits of ``path``."""
+    return os.stat(path).st_mode & 0o777
+
+
+class RenderCacheTests(RenderTestMixin, SimpleTestCase):
+    def test_repeated_render_is_a_memory_hit(self):
+        first = generate_logo(SHORT_CONFIG)
+        second = generate_logo(SHORT_CONFIG)
+
+        self.assertEqual(first.data, second.data)
+        stats = get_render_cache().stats()
+        self.assertEqual((stats["misses"], stats["memory_hits"]), (1, 1))
+
+    def test_render_is_read_back_from_disk(self):
+        first = generate_logo(SHORT_CONFIG)
+        # A new process starts with an empty memory level
+        reset_render_cache()
+        second = generate_logo(SHORT_CONFIG)
+
+        self.assertEqual(first.data, second.data)
+        self.assertEqual(get_render_cache().stats()["disk_hits"], 1)
+
+    def test_memory_level_evicts_least_recently_used(self):
+        cache = RenderCache(max_bytes=2500)
+        cache.put("a", cached_result(1000))
+        cache.put("b", cached_result(1000))
+        cache.get("a")
+        cache.put("c", cached_result(1000))
+
+        self.assertIsNone(cache.get("b"))
+        self.assertIsNotNone(cache.get("a"))
+        self.assertIsNotNone(cache.get("c"))
+
+    def test_disk_level_evicts_least_recently_used(self):
+        cache = RenderCache(0, cache_dir=self.cache_dir, max_disk_bytes=2500)
+        old_key, new_key = "a" * 64, "b" * 64
+        cache.put(old_key, cached_result(1000))
+        os.utime(cache._disk_path(old_key), (0, 0))
+        cache.put(new_key, cached_result(1000))
+        cache.put("c" * 64, cached_result(1000))
+
+        self.assertFalse(os.path.exists(cache._disk_path(old_key)))
+        self.assertIsNotNone(cache.get(new_key))
+
+    def test_disk_entries_are_readable_by_other_workers(self):
+        plain = os.path.join(self.cache_dir, "plain")
+        with open(plain, "w"):
+            pass
+        cache = RenderCache(1024, cache_dir=self.cache_dir, max_disk_bytes=10**6)
+        cache.put("e" * 64, cached_result(10))
+
+        self.assertEqual(file_mode(cache._disk_path("e" * 64)), file_mode(plain))
+
+    def test_stats_leave_the_disk_alone(self):
+        cache = RenderCache(1024, cache_dir=self.cache_dir, max_disk_bytes=10)
+        # An entry another worker wrote, well over this cache's budget
+        path = cache._disk_path("d" * 64)
+        os.makedirs(os.path.dirname(path))
+        with open(path, "wb") as f:
+            f.write(b"\0" * 1000)
+
+        cache.stats()
+        self.assertTrue(os.path.exists(path))
+
+    def test_matching_etag_is_not_modified(self):
+        response = self.post_config(SHORT_CONFIG)
+        self.assertEqual(response.status_code, 200)
+        etag = response["ETag"]
+
+        response = self.post_config(SHORT_CONFIG, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response["ETag"], etag)
+
+        response = self.post_config(SHORT_CONFIG, HTTP_IF_NONE_MATCH='"other"')
+        self.assertEqual(response.status_code, 200)
+
+
+class ExportTests(RenderTestMixin, SimpleTestCase):
+    def test_ico_export_at_its_smallest_size(self):
+        # At 16 px the small print shrinks below one pixel per em
+        config = benchmark_config(
+            [
+                text_layer(SHORT_TEXT, font_size=120),
+                text_layer("small print", font_size=8, y=300),
+            ],
+            auto_trim=True,
+            exports=[{"format": "ico"}],
+        )
+        (export,) = generate_logo(config).exports
+
+        self.assertEqual(export.content_type, "image/x-icon")
+        with Image.open(io.BytesIO(export.data)) as icon:
+            self.assertIn((16, 16), icon.info["sizes"])
+            icon.size = (16, 16)
+            icon.load()
+            self.assertIsNotNone(icon.getbbox())
+
+    def test_saved_files_get_the_mode_of_a_plain_open(self):
+        directory = self.enterContext(tempfile.TemporaryDirectory())
+        plain = os.path.join(directory, "plain")
+        with open(plain, "w"):
+            pass
+        result = generate_logo(
+            benchmark_config([text_layer(SHORT_TEXT)], exports=[{"format": "ico"}])
+        )
+        output_path = result.save(os.path.join(directory, "logo.png"))
+        (export_path,) = result.save_exports(output_path)
+
+        self.assertEqual(file_mode(output_path), file_mode(plain))
+        self.assertEqual(file_mode(export_path), file_mode(plain))
+
+
+class AtomicWriteTests(SimpleTestCase):
+    def setUp(self):
+        self.directory = self.enterContext(tempfile.TemporaryDirectory())
+
+    def test_file_gets_the_mode_of_a_plain_open(self):
+        plain = os.path.join(self.directory, "plain")
+        with open(plain, "w"):
+            pass
+        written = os.path.join(self.directory, "written")
+        atomic_write(written, "text")
+        self.assertEqual(file_mode(written), file_mode(plain))
+
+    def test_chunks_are_written_in_order(self):
+        path = os.path.join(self.directory, "chunks")
+        atomic_write(path, [b"head\n", b"body", b""])
+        with open(path, "rb") as f:
+            self.assertEqual(f.read(), b"head\nbody")
+        self.assertEqual(os.listdir(self.directory), ["chunks"])
+
+
+class SingleFlightTests(SimpleTestCase):
+    threads = 8
+
+    def call_concurrently(self, flight, fn, release):
+        """
+        Call ``fn`` through ``flight`` from several threads at once.
+
+        ``release`` is set shortly after, once every thread had time to queue
+        up behind the first call.
+        """
+        started = threading.Barrier(self.threads + 1)
+
+        def call():
+            started.wait()
+            return flight.do("key", fn)
+
+        with ThreadPoolExecutor(self.threads) as pool:
+            calls = [pool.submit(call) for _ in range(self.threads)]
+            started.wait()
+            threading.Timer(0.2, release.set).start()
+        return calls
+
+    def test_concurrent_calls_share_one_run(self):
+        flight = SingleFlight()
+        runs = []
+        release = threading.Event()
+
+        def fn():
+            runs.append(None)
+            release.wait(5)
+            return object()
+
+        calls = self.call_concurrently(flight, fn, release)
+        results = {call.result() for call in calls}
+
+        self.assertEqual(len(runs), 1)
+        self.assertEqual(len(results), 1)
+
+    def test_concurrent_calls_share_the_error(self):
+        flight = SingleFlight()
+        release = threading.Event()
+
+        def fn():
+            release.wait(5)
+            raise ValueError("download failed")
+
+        calls = self.call_concurrently(flight, fn, release)
+        for call in calls:
+            with self.assertRaisesMessage(ValueError, "download failed"):
+                call.result()
+
+    def test_finished_call_runs_again(self):
+        flight = SingleFlight()
+        self.assertEqual(flight.do("key", lambda: 1), 1)
+        self.assertEqual(flight.do("key", lambda: 2), 2)
+
+
+class CompressionTests(RenderTestMixin, SimpleTestCase):
+    svg_config = dict(SHORT_CONFIG, output="svg")
+
+    def test_negotiation_follows_client_preferences(self):
+        available = {"br", "gzip"}
+        self.assertEqual(negotiate_encoding("gzip, deflate, br", available), "br")
+        self.assertEqual(negotiate_encoding("gzip, br;q=0.5", available), "gzip")
+        self.assertEqual(negotiate_encoding("*", {"gzip"}), "gzip")
+        self.assertEqual(negotiate_encoding("br;q=0, identity", available), None)
+        self.assertEqual(negotiate_encoding(None, available), None)
+
+    def test_svg_variants_are_stored_with_the_render(self):
+        result = generate_logo(self.svg_config)
+        self.assertEqual(gzip.decompress(result.encoded("gzip")), result.data)
+
+        # Read back from the shared directory, variants included
+        reset_render_cache()
+        cached = generate_logo(self.svg_config)
+        self.assertEqual(get_render_cache().stats()["disk_hits"], 1)
+        self.assertEqual(cached.encodings, result.encodings)
+
+    def test_response_is_compressed_when_accepted(self):
+        plain = self.post_config(self.svg_config)
+        response = self.post_config(self.svg_config, HTTP_ACCEPT_ENCODING="gzip")
+
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertEqual(gzip.decompress(response.content), plain.content)
+        self.assertIn("Accept-Encoding", response["Vary"])
+        self.assertNotEqual(response["ETag"], plain["ETag"])
+
+    def test_not_modified_keeps_the_cache_headers(self):
+        response = self.post_config(self.svg_config, HTTP_ACCEPT_ENCODING="gzip")
+        not_modified = self.post_config(
+            self.svg_config,
+            HTTP_ACCEPT_ENCODING="gzip",
+            HTTP_IF_NONE_MATCH=response["ETag"],
+        )
+
+        self.assertEqual(not_modified.status_code, 304)
+        for header in ("ETag", "Cache-Control"):
+            self.assertEqual(not_modified[header], response[header])
+        self.assertIn("Accept-Encoding", not_modified["Vary"])
+
+    def test_raster_response_does_not_vary_on_encoding(self):
+        response = self.post_config(SHORT_CONFIG, HTTP_ACCEPT_ENCODING="gzip")
+
+        self.assertNotIn("Content-Encoding", response)
+        self.assertNotIn("Accept-Encoding", response.get("Vary", ""))
+
+
+def jsonl(*records):
+    """Return a text stream with one JSON line per record."""
+    return io.StringIO("".join(f"{json.dumps(record)}\n" for record in records))
+
+
+class BatchTests(RenderTestMixin, SimpleTestCase):
+    def setUp(self):
+        super().setUp()
+        self.output_dir = self.enterContext(tempfile.TemporaryDirectory())
+
+    def batch(self, stream, **options):
+        records = read_batch_records(stream)
+        return list(run_batch(records, self.output_dir, jobs=1, **options))
+
+    def test_records_are_rendered_in_order_with_their_errors(self):
+        lines = [
+            json.dumps({"id": "short", "config": SHORT_CONFIG}),
+            "[1, 2]",
+            json.dumps(SHORT_CONFIG),
+            "",
+            "{not json",
+        ]
+        results = self.batch(io.StringIO("\n".join(lines)))
+
+        self.assertEqual([r["line"] for r in results], [1, 2, 3, 5])
+        self.assertEqual([r["id"] for r in results], ["short", "2", "3", "5"])
+        short, not_object, by_line, bad_json = results
+        self.assertIsNone(short["error"])
+        self.assertEqual(short["output"], os.path.join(self.output_dir, "short.png"))
+        with Image.open(short["output"]) as image:
+            self.assertEqual(image.size, (short["width"], short["height"]))
+        self.assertEqual(not_object["error"], "Configuration must be a JSON object")
+        self.assertIsNone(not_object["output"])
+        self.assertTrue(os.path.exists(by_line["output"]))
+        self.assertTrue(bad_json["error"].startswith("Invalid JSON"))
+
+    def test_duplicate_ids_do_not_overwrite_the_first_output(self):
+        results = self.batch(
+            jsonl(
+                {"id": "logo", "config": SHORT_CONFIG},
+                {"id": "logo", "config": dict(SHORT_CONFIG, auto_trim=True)},
+            )
+        )
+
+        first, duplicate = results
+        self.assertIsNone(first["error"])
+        self.assertIn("Duplicate record id 'logo': line 1", duplicate["error"])
+        self.assertIsNone(duplicate["output"])
+        with Image.open(first["output"]) as image:
+            self.assertEqual(image.size, (first["width"], first["height"]))
+
+    def test_resume_skips_records_already_rendered(self):
+        self.batch(jsonl({"id": "done", "config": SHORT_CONFIG}))
+        results = self.batch(
+            jsonl(
+                {"id": "done", "config": SHORT_CONFIG},
+                {"id": "new", "config": SHORT_CONFIG},
+            ),
+            resume=True,
+        )
+
+        done, new = results
+        self.assertTrue(done["skipped"])
+        self.assertNotIn("skipped", new)
+        self.assertTrue(os.path.exists(new["output"]))
+
+    def test_batch_from_stdin_leaves_it_open(self):
+        stdin = jsonl({"id": "piped", "config": SHORT_CONFIG})
+        stdout = io.StringIO()
+        with mock.patch("sys.stdin", stdin):
+            call_command(
+                "generate_logo",
+                batch="-",
+                output_dir=self.output_dir,
+                jobs=1,
+                stdout=stdout,
+            )
+
+        self.assertFalse(stdin.closed)
+        self.assertEqual(json.loads(stdout.getvalue())["id"], "piped")
+
+
+class ServeTests(RenderTestMixin, SimpleTestCase):
+    def serve(self, *lines, overrides=None):
+        output = io.StringIO()
+        failed = serve(io.StringIO("\n".join(lines)), output, overrides)
+        return failed, [json.loads(line) for line in output.getvalue().splitlines()]
+
+    def test_requests_are_answered_in_order(self):
+        output_path = os.path.join(self.cache_dir, "saved.png")
+        failed, records = self.serve(
+            json.dumps(SHORT_CONFIG),
+            "",
+            json.dumps({"id": "saved", "config": SHORT_CONFIG, "output": output_path}),
+        )
+
+        self.assertEqual(failed, 0)
+        inline, saved = records
+        self.assertEqual((inline["line"], inline["id"]), (1, "1"))
+        self.assertIsNone(inline["error"])
+        with Image.open(io.BytesIO(base64.b64decode(inline["data"]))) as image:
+            self.assertEqual(image.size, (inline["width"], inline["height"]))
+        self.assertIn("timings", inline)
+        self.assertEqual((saved["line"], saved["id"]), (3, "saved"))
+        self.assertEqual(saved["output"], output_path)
+        self.assertNotIn("data", saved)
+        self.assertTrue(os.path.exists(output_path))
+
+    def test_bad_requests_are_answered_with_errors(self):
+        failed, records = self.serve(
+            "{not json",
+            "[1, 2]",
+            json.dumps({"id": "bad", "config": SHORT_CONFIG, "output": 3}),
+            json.dumps(SHORT_CONFIG),
+        )
+
+        self.assertEqual(failed, 3)
+        bad_json, not_object, bad_output, rendered = records
+        self.assertTrue(bad_json["error"].startswith("Invalid JSON"))
+        self.assertEqual(not_object["error"], "Configuration must be a JSON object")
+        self.assertEqual(
+            (bad_output["id"], bad_output["error"]),
+            ("bad", "Output must be a file path"),
+        )
+        self.assertIsNone(rendered["error"])
+
+    def test_overrides_apply_to_every_request(self):
+        _, records = self.serve(json.dumps(SHORT_CONFIG), overrides={"auto_trim": True})
+        (record,) = records
+        trimmed = generate_logo(dict(SHORT_CONFIG, auto_trim=True))
+        self.assertEqual(
+            (record["width"], record["height"]), (trimmed.width, trimmed.height)
+        )
+
+
+class RenderJobTests(RenderTestMixin, TestCase):
+    def test_job_is_queued_claimed_and_fetched(self):
+        response = self.client.post(
+            "/api/jobs/", SHORT_CONFIG, content_type="application/json"
+        )
+        self.assertEqual(response.status_code, 202)
+        job_id = response.json()["id"]
+        self.assertEqual(response["Location"], f"/api/jobs/{job_id}/")
+        self.assertEqual(
+            self.client.get(response["Location"]).json()["status"], "queued"
+        )
+
+        result_url = f"/api/jobs/{job_id}/result/"
+        self.assertEqual(self.client.get(result_url).status_code, 409)
+
+        job = claim_next_job()
+        self.assertEqual(str(job.id), job_id)
+        self.assertEqual((job.status, job.attempts), (RenderJob.Status.RUNNING, 1))
+        # Nothing else is queued, and a running job isn't claimed twice
+        self.assertIsNone(claim_next_job())
+
+        run_render_job(job)
+        status = self.client.get(f"/api/jobs/{job_id}/").json()
+        self.assertEqual(status["status"], "done")
+        self.assertTrue(status["result_url"].endswith(result_url))
+
+        response = self.client.get(result_url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, generate_logo(SHORT_CONFIG).data)
+        response = self.client.get(result_url, HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(response.status_code, 304)
+
+    def test_requeued_job_is_not_overwritten_by_a_late_worker(self):
+        job = enqueue_render_job(SHORT_CONFIG)
+        stale = claim_next_job()
+        # The worker is presumed dead and the job goes to another one
+        RenderJob.objects.filter(id=job.id).update(
+            started_at=timezone.now() - timedelta(hours=1)
+        )
+        self.assertEqual(requeue_stale_jobs(stale_after=60, max_attempts=3), 1)
+        retry = claim_next_job()
+        self.assertEqual(retry.attempts, 2)
+
+        self.assertFalse(run_render_job(stale))
+        job.refresh_from_db()
+        self.assertEqual(job.status, RenderJob.Status.RUNNING)
+        self.assertIsNone(job.result)
+
+        self.assertTrue(run_render_job(retry))
+        job.refresh_from_db()
+        self.assertEqual(job.status, RenderJob.Status.DONE)
+
+    def test_failed_render_is_reported(self):
+        job = enqueue_render_job({"image": {}, "layers": [{"text": "No font"}]})
+        run_render_job(claim_next_job())
+
+        status = self.client.get(f"/api/jobs/{job.id}/").json()
+        self.assertEqual(status["status"], "failed")
+        self.assertIn("font_family", status["error"])
+        self.assertEqual(
+            self.client.get(f"/api/jobs/{job.id}/result/").status_code, 409
+        )
+
+
+# Renders an SVG with the bundled fonts and prints its hash
+SVG_HASH_SCRIPT = """
+import hashlib, django
+django.setup()
+from logo_generator.benchmarks.suite import SHORT_CONFIG, benchmark_fonts
+from logo_generator.services.logo_service import generate_logo
+with benchmark_fonts():
+    config = dict(SHORT_CONFIG, output="svg", svg_options={"embed_fonts": True})
+    print(hashlib.sha256(generate_logo(config).data).hexdigest())
+"""
+
+
+class SvgOutputTests(RenderTestMixin, SimpleTestCase):
+    def test_output_is_byte_identical_across_runs(self):
+        hashes = {
+            subprocess.run(
+                [sys.executable, "-c", SVG_HASH_SCRIPT],
+                check=True,
+                capture_output=True,
+                text=True,
+                cwd=settings.BASE_DIR,
+                env={**os.environ, "PYTHONHASHSEED": seed, "RENDER_CACHE_DIR": ""},
+            ).stdout
+            for seed in ("1", "2")
+        }
+        (svg_hash,) = hashes
+        self.assertRegex(svg_hash, r"^[0-9a-f]{64}$")
+
+    def test_x_list_has_one_entry_per_utf16_unit(self):
+        text = "Logo \U0001f680 ship it"
+        result = generate_logo(benchmark_config([text_layer(text)], output="svg"))
+
+        (element,) = ET.fromstring(result.data).iter("{http://www.w3.org/2000/svg}text")
+        self.assertEqual(element.text, text)
+        positions = element.get("x").split()
+        self.assertEqual(len(positions), len(text.encode("utf-16-le")) // 2)
+        # Both units of the rocket share its position
+        rocket = text.index("\U0001f680")
+        self.assertEqual(positions[rocket], positions[rocket + 1])
+        self.assertLess(float(positions[rocket - 1]), float(positions[rocket]))
+
+
+class TrimTests(RenderTestMixin, SimpleTestCase):
+    def assert_same_size(self, config):
+        png = generate_logo(dict(config, output="png"))
+        svg = generate_logo(dict(config, output="svg"))
+        self.assertTrue(png.trimmed and svg.trimmed)
+        self.assertEqual((png.width, png.height), (svg.width, svg.height))
+
+    def test_trimmed_png_and_svg_have_the_same_size(self):
+        self.assert_same_size(dict(SHORT_CONFIG, auto_trim=True))
+
+    def test_trimmed_png_and_svg_have_the_same_size_over_a_background(self):
+        image = dict(SHORT_CONFIG["image"], background="#ffeedd")
+        self.assert_same_size(dict(SHORT_CONFIG, auto_trim=True, image=image))
+
+    def test_trimming_an_svg_file_matches_auto_trim(self):
+        svg = generate_logo(dict(SHORT_CONFIG, output="svg"))
+        trimmed = generate_logo(dict(SHORT_CONFIG, output="svg", auto_trim=True))
+        with contextlib.redirect_stdout(io.StringIO()):
+            content, width, height = trim_svg_content(svg.data.decode("utf-8"))
+
+        self.assertEqual((width, height), (trimmed.width, trimmed.height))
+        viewbox = re.search(r'viewBox="([^"]*)"', content).group(1)
+        expected = re.search(rb'viewBox="([^"]*)"', trimmed.data).group(1)
+        self.assertEqual(
+            [float(value) for value in viewbox.split()],
+            [float(value) for value in expected.split()],
+        )
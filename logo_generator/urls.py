@@ -1,7 +1,29 @@
 from django.urls import path
 
-from .views import GenerateLogoView
+from .views import (
+    GenerateLogoView,
+    RenderCacheStatsView,
+    RenderJobListView,
+    RenderJobResultView,
+    RenderJobView,
+    generate_logo_async_view,
+    metrics_view,
+)
 
 urlpatterns = [
     path("generate-logo/", GenerateLogoView.as_view(), name="generate-logo"),
+    path(
+        "generate-logo/async/",
+        generate_logo_async_view,
+        name="generate-logo-async",
+    ),
+    path("jobs/", RenderJobListView.as_view(), name="render-jobs"),
+    path("jobs/<uuid:job_id>/", RenderJobView.as_view(), name="render-job"),
+    path(
+        "jobs/<uuid:job_id>/result/",
+        RenderJobResultView.as_view(),
+        name="render-job-result",
+    ),
+    path("render-cache/", RenderCacheStatsView.as_view(), name="render-cache"),
+    path("metrics/", metrics_view, name="metrics"),
 ]
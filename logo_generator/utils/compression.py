@@ -0,0 +1,95 @@
+import gzip
+
+from django.conf import settings
+
+# brotli is optional: without it only gzip variants are produced
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Content types stored with precompressed variants; raster formats are
+# compressed already
+COMPRESSIBLE_CONTENT_TYPES = ("image/svg+xml",)
+
+# Content codings in order of preference when a client accepts several
+PREFERRED_ENCODINGS = ("br", "gzip")
+
+
+def compress_variants(data):
+    """
+    Compress data with every available content coding.
+
+    Variants that aren't smaller than the data itself are left out.
+
+    Returns:
+        Tuple of (encoding, compressed bytes) pairs, in order of preference
+    """
+    variants = []
+    if brotli is not None:
+        variants.append(
+            (
+                "br",
+                brotli.compress(
+                    data,
+                    mode=brotli.MODE_TEXT,
+                    quality=getattr(settings, "RENDER_BROTLI_QUALITY", 5),
+                ),
+            )
+        )
+    variants.append(
+        (
+            "gzip",
+            # A fixed mtime keeps the variant identical across renders
+            gzip.compress(
+                data, compresslevel=getattr(settings, "RENDER_GZIP_LEVEL", 9), mtime=0
+            ),
+        )
+    )
+    return tuple(
+        (encoding, compressed)
+        for encoding, compressed in variants
+        if len(compressed) < len(data)
+    )
+
+
+def parse_accept_encoding(header):
+    """Return {coding: quality} from an ``Accept-Encoding`` header value."""
+    qualities = {}
+    for entry in (header or "").split(","):
+        coding, _, params = entry.partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        quality = 1.0
+        for param in params.split(";"):
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        qualities[coding] = quality
+    return qualities
+
+
+def negotiate_encoding(accept_encoding, available):
+    """
+    Pick the content coding to send among the available variants.
+
+    The highest quality acceptable coding wins, ties going to the preferred
+    order. ``*`` covers codings the header doesn't name.
+
+    Returns:
+        Coding name, or None to send the data unencoded
+    """
+    qualities = parse_accept_encoding(accept_encoding)
+    best = None
+    best_quality = 0.0
+    for encoding in PREFERRED_ENCODINGS:
+        if encoding not in available:
+            continue
+        quality = qualities.get(encoding, qualities.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
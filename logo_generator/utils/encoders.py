@@ -0,0 +1,97 @@
+import io
+import sys
+import time
+from array import array
+
+# Named encoder profiles for raster output:
+#   default: PNG with Pillow's default settings
+#   fast:    PNG with the lowest zlib level, for the quickest encode
+#   small:   optimized PNG, as an exact palette image whenever the logo has
+#            at most 256 colours
+#   webp:    lossless WebP
+ENCODER_PROFILES = ("default", "fast", "small", "webp")
+
+ENCODER_CONTENT_TYPES = {
+    "default": "image/png",
+    "fast": "image/png",
+    "small": "image/png",
+    "webp": "image/webp",
+}
+
+
+def to_palette(image):
+    """
+    Convert an image with at most 256 colours to an identical palette image.
+
+    Flat logos usually have one band that tells their colours apart, such
+    as the alpha of a single colour drawn on a transparent canvas. Pixels
+    are then indexed through that band with a lookup table, which keeps
+    the conversion exact, unlike quantization. Otherwise, as with text
+    antialiased over an opaque background, every pixel is looked up by its
+    whole colour, which is slower but just as exact.
+
+    Returns:
+        Palette image, or None if the image has more than 256 colours
+    """
+    # The CLI imports this module before Pillow is needed
+    from PIL import Image
+
+    if image.mode != "RGBA":
+        return None
+    colors = image.getcolors(256)
+    if colors is None:
+        return None
+    colors = [color for _, color in colors]
+    palette = b"".join(bytes(color) for color in colors)
+
+    for band_index, band in enumerate(image.getbands()):
+        indices = {}
+        for palette_index, color in enumerate(colors):
+            if color[band_index] in indices:
+                break
+            indices[color[band_index]] = palette_index
+        else:
+            lut = [indices.get(value, 0) for value in range(256)]
+            palette_image = image.getchannel(band).point(lut)
+            palette_image.putpalette(palette, rawmode="RGBA")
+            return palette_image
+
+    # Read every RGBA pixel as one 32-bit integer and map it to its index
+    indices = {
+        int.from_bytes(bytes(color), sys.byteorder): palette_index
+        for palette_index, color in enumerate(colors)
+    }
+    pixels = array("I")
+    if pixels.itemsize != 4:
+        return None
+    pixels.frombytes(image.tobytes())
+    palette_image = Image.frombytes(
+        "P", image.size, bytes(map(indices.__getitem__, pixels))
+    )
+    palette_image.putpalette(palette, rawmode="RGBA")
+    return palette_image
+
+
+def encode_image(image, profile="default"):
+    """
+    Encode an image with a named encoder profile.
+
+    Returns:
+        Tuple of (encoded bytes, content type, encode time in milliseconds)
+    """
+    if profile not in ENCODER_CONTENT_TYPES:
+        raise Exception(f"Unknown encoder profile: {profile}")
+
+    started = time.perf_counter()
+    buffer = io.BytesIO()
+    if profile == "fast":
+        image.save(buffer, "PNG", compress_level=1)
+    elif profile == "small":
+        palette_image = to_palette(image)
+        (palette_image or image).save(buffer, "PNG", optimize=True)
+    elif profile == "webp":
+        image.save(buffer, "WEBP", lossless=True)
+    else:
+        image.save(buffer, "PNG")
+    encode_ms = (time.perf_counter() - started) * 1000
+    return buffer.getvalue(), ENCODER_CONTENT_TYPES[profile], encode_ms
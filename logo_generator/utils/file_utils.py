@@ -0,0 +1,57 @@
+import os
+import tempfile
+from contextlib import contextmanager
+
+from django.conf import settings
+from filelock import FileLock, Timeout
+
+# The process umask, read once at import: os.umask can only be read by
+# setting it, which would race with files created by other threads
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+
+def atomic_write(path, data):
+    """
+    Write bytes or text to a file atomically.
+
+    The data goes to a temporary file in the same directory which is then
+    renamed over ``path``, so readers see either the old or the new file,
+    never a partial one. ``data`` may also be a list of byte strings, which
+    are written one after the other.
+
+    The file gets the permissions ``open()`` would give it under the
+    process umask, rather than the owner-only mode of temporary files, so
+    other users and workers can read it.
+    """
+    mode = "w" if isinstance(data, str) else "wb"
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or ".", suffix=".tmp")
+    try:
+        os.fchmod(fd, 0o666 & ~_UMASK)
+        with os.fdopen(fd, mode) as f:
+            if isinstance(data, list):
+                f.writelines(data)
+            else:
+                f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+@contextmanager
+def file_lock(path):
+    """Hold an exclusive, cross-process lock on ``<path>.lock``."""
+    timeout = getattr(settings, "FILE_LOCK_TIMEOUT", 60)
+    lock = FileLock(f"{path}.lock", timeout=timeout)
+    try:
+        lock.acquire()
+    except Timeout as e:
+        raise Exception(f"Timed out waiting for lock on {path}") from e
+    try:
+        yield
+    finally:
+        lock.release()
@@ -0,0 +1,103 @@
+import os
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+from logo_generator.utils.font_pack import font_data_size, open_font_file
+from logo_generator.utils.timing import timing_span
+from PIL import ImageFont
+
+
+class FontCache:
+    """LRU cache of loaded FreeType fonts keyed by (path, size, layout engine)."""
+
+    def __init__(self, max_entries=128, max_bytes=64 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._fonts = OrderedDict()
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, font_path, font_size, layout_engine=None):
+        """Return a loaded font, parsing the font file only on a cache miss."""
+        key = (os.fspath(font_path), font_size, layout_engine)
+        with self._lock:
+            entry = self._fonts.get(key)
+            if entry is not None:
+                self._fonts.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+
+        # Parse outside the lock so a slow font file doesn't stall other threads
+        with timing_span("font_load"):
+            font = ImageFont.truetype(
+                open_font_file(key[0]), font_size, layout_engine=layout_engine
+            )
+        size = font_data_size(key[0])
+
+        with self._lock:
+            entry = self._fonts.get(key)
+            if entry is not None:
+                # Another thread loaded the same font in the meantime
+                return entry[0]
+            self._fonts[key] = (font, size)
+            self.bytes += size
+            self._evict()
+        return font
+
+    def _evict(self):
+        """Drop least recently used fonts until both limits are satisfied."""
+        while len(self._fonts) > 1 and (
+            len(self._fonts) > self.max_entries or self.bytes > self.max_bytes
+        ):
+            _, (_, size) = self._fonts.popitem(last=False)
+            self.bytes -= size
+            self.evictions += 1
+
+    def clear(self):
+        """Remove all cached fonts and reset the counters."""
+        with self._lock:
+            self._fonts.clear()
+            self.bytes = 0
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+    def stats(self):
+        """Return cache counters as a dictionary."""
+        with self._lock:
+            return {
+                "entries": len(self._fonts),
+                "bytes": self.bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+_font_cache = None
+_font_cache_lock = threading.Lock()
+
+
+def get_font_cache():
+    """Return the process-wide font cache, creating it from settings on first use."""
+    global _font_cache
+    if _font_cache is None:
+        with _font_cache_lock:
+            if _font_cache is None:
+                _font_cache = FontCache(
+                    max_entries=getattr(settings, "FONT_CACHE_MAX_ENTRIES", 128),
+                    max_bytes=getattr(
+                        settings, "FONT_CACHE_MAX_BYTES", 64 * 1024 * 1024
+                    ),
+                )
+    return _font_cache
+
+
+def get_font(font_path, font_size, layout_engine=None):
+    """Load a font through the process-wide font cache."""
+    return get_font_cache().get(font_path, font_size, layout_engine)
@@ -0,0 +1,177 @@
+import json
+import os
+import threading
+
+from django.conf import settings
+from logo_generator.utils.file_utils import atomic_write, file_lock
+from logo_generator.utils.timing import timed
+
+FONT_LIST_FILE = "font_list.json"
+FONT_INDEX_FILE = "font_index.json"
+FONT_INDEX_VERSION = 1
+
+# Nearly every Google Fonts file URL shares this prefix, so the index
+# stores it once and keeps only the remainder of each URL
+FONT_URL_PREFIX = "https://fonts.gstatic.com/s/"
+
+
+def normalize_family(font_family):
+    """Normalize a font family name for case- and whitespace-insensitive lookups."""
+    return " ".join(font_family.split()).casefold()
+
+
+class FontCatalog:
+    """In-memory index of the Google Fonts catalog keyed by normalized family."""
+
+    def __init__(self, families):
+        # {normalized family: (family, {variant: url})}
+        self.families = families
+
+    @classmethod
+    def from_font_list(cls, fonts):
+        """Build the index from the raw Google Fonts API item list."""
+        families = {}
+        for font in fonts:
+            family = font["family"]
+            families[normalize_family(family)] = (family, dict(font.get("files", {})))
+        return cls(families)
+
+    @classmethod
+    def load_index(cls, index_path):
+        """Load an index previously written with ``save_index``."""
+        with open(index_path) as f:
+            data = json.load(f)
+        if data.get("version") != FONT_INDEX_VERSION:
+            raise ValueError(f"Unsupported font index version in {index_path}")
+
+        prefix = data["prefix"]
+        families = {}
+        for family, variants in data["families"].items():
+            families[normalize_family(family)] = (
+                family,
+                {
+                    variant: url if "://" in url else prefix + url
+                    for variant, url in variants.items()
+                },
+            )
+        return cls(families)
+
+    def save_index(self, index_path):
+        """Write a compact index that loads much faster than the raw font list."""
+        families = {}
+        for family, files in self.families.values():
+            families[family] = {
+                variant: url.removeprefix(FONT_URL_PREFIX)
+                for variant, url in files.items()
+            }
+        data = {
+            "version": FONT_INDEX_VERSION,
+            "prefix": FONT_URL_PREFIX,
+            "families": families,
+        }
+        atomic_write(index_path, json.dumps(data, separators=(",", ":")))
+
+    def get_files(self, font_family):
+        """Return the variant to URL map for a family, or None if it is unknown."""
+        entry = self.families.get(normalize_family(font_family))
+        return entry[1] if entry else None
+
+    def get_variant_url(self, font_family, variant):
+        """Return the download URL of a font variant."""
+        files = self.get_files(font_family)
+        if files is None:
+            raise Exception(f"Font family {font_family} not found")
+        if variant not in files:
+            raise Exception(f"Variant {variant} not found for font {font_family}")
+        return files[variant]
+
+
+@timed("font_list_fetch")
+def download_font_list():
+    """Download the full font list from the Google Fonts API."""
+    if not settings.GOOGLE_FONTS_API_KEY:
+        raise Exception("Missing GOOGLE_FONTS_API_KEY in environment configuration")
+
+    # Imported here: the catalog is usually read from its on-disk index
+    import requests
+
+    try:
+        response = requests.get(
+            f"https://www.googleapis.com/webfonts/v1/webfonts?key={settings.GOOGLE_FONTS_API_KEY}",
+            timeout=10,
+        )
+        response.raise_for_status()
+        return response.json().get("items", [])
+    except requests.exceptions.RequestException as e:
+        raise Exception(
+            f"Unable to retrieve font list from Google Fonts API: {str(e)}"
+        ) from e
+
+
+def load_fresh_index(index_path, font_list_path):
+    """Return the catalog from the on-disk index, or None if it is stale."""
+    index_mtime = os.path.getmtime(index_path) if os.path.exists(index_path) else None
+    list_mtime = (
+        os.path.getmtime(font_list_path) if os.path.exists(font_list_path) else None
+    )
+
+    # The index is only trusted if it is at least as new as the raw font list
+    if index_mtime is not None and (list_mtime is None or index_mtime >= list_mtime):
+        try:
+            return FontCatalog.load_index(index_path)
+        except (OSError, ValueError, KeyError):
+            pass
+    return None
+
+
+def load_font_catalog(cache_dir):
+    """Load the catalog from the on-disk index, rebuilding it when needed."""
+    index_path = os.path.join(cache_dir, FONT_INDEX_FILE)
+    font_list_path = os.path.join(cache_dir, FONT_LIST_FILE)
+
+    catalog = load_fresh_index(index_path, font_list_path)
+    if catalog is not None:
+        return catalog
+
+    os.makedirs(cache_dir, exist_ok=True)
+    # One worker rebuilds the index; the others wait and load what it wrote
+    with file_lock(font_list_path):
+        catalog = load_fresh_index(index_path, font_list_path)
+        if catalog is not None:
+            return catalog
+
+        fonts = None
+        if os.path.exists(font_list_path):
+            with open(font_list_path) as f:
+                fonts = json.load(f)
+
+        if not fonts:
+            fonts = download_font_list()
+            # Keep the raw list around as the source of truth for the index
+            atomic_write(font_list_path, json.dumps(fonts))
+
+        catalog = FontCatalog.from_font_list(fonts)
+        catalog.save_index(index_path)
+    return catalog
+
+
+_catalogs = {}
+_catalogs_lock = threading.Lock()
+
+
+def get_font_catalog(cache_dir):
+    """Return the process-wide catalog for a font cache directory."""
+    catalog = _catalogs.get(cache_dir)
+    if catalog is None:
+        with _catalogs_lock:
+            catalog = _catalogs.get(cache_dir)
+            if catalog is None:
+                catalog = load_font_catalog(cache_dir)
+                _catalogs[cache_dir] = catalog
+    return catalog
+
+
+def reset_font_catalog():
+    """Forget loaded catalogs so the next lookup reloads them from disk."""
+    with _catalogs_lock:
+        _catalogs.clear()
@@ -0,0 +1,71 @@
+import base64
+import os
+import threading
+
+from django.conf import settings
+from logo_generator.utils.font_pack import read_font_data
+from logo_generator.utils.font_subset import SUBSET_FORMATS, subset_font
+from logo_generator.utils.font_utils import font_file_hash
+from logo_generator.utils.lru_cache import SizedLRUCache
+
+_font_face_cache = None
+_font_face_cache_lock = threading.Lock()
+
+
+def get_font_face_cache():
+    """Return the process-wide @font-face block cache."""
+    global _font_face_cache
+    if _font_face_cache is None:
+        with _font_face_cache_lock:
+            if _font_face_cache is None:
+                _font_face_cache = SizedLRUCache(
+                    getattr(settings, "FONT_FACE_CACHE_MAX_BYTES", 32 * 1024 * 1024)
+                )
+    return _font_face_cache
+
+
+def font_face_css(font_family, font_path, text=None, flavor=None):
+    """
+    Return an @font-face rule embedding a font as a data URI.
+
+    Rules are memoized by font content hash, glyph set and format, so a
+    font is read and base64-encoded at most once per process.
+
+    Args:
+        font_family: CSS family name of the rule
+        font_path: Path of the font file
+        text: Characters to keep when subsetting; None embeds the whole font
+        flavor: Subset flavor, None or "woff2"
+    """
+    glyph_set = "".join(sorted(set(text))) if text is not None else None
+    key = (font_family, font_file_hash(font_path), glyph_set, flavor)
+    font_face_cache = get_font_face_cache()
+    css = font_face_cache.get(key)
+    if css is not None:
+        return css
+
+    if glyph_set is not None:
+        font_data = subset_font(font_path, glyph_set, flavor)
+        font_format = SUBSET_FORMATS[flavor]
+    else:
+        font_data = read_font_data(font_path)
+
+        # Determine font format from file extension
+        font_format = os.path.splitext(font_path)[1].lower().replace(".", "")
+        if font_format == "ttf":
+            font_format = "truetype"
+
+    # Encode font as base64
+    encoded_font = base64.b64encode(font_data).decode("utf-8")
+
+    # Create @font-face rule
+    css = f"""
+@font-face {{
+    font-family: '{font_family}';
+    src: url('data:font/{font_format};base64,{encoded_font}') format('{font_format}');
+    font-weight: normal;
+    font-style: normal;
+}}
+            """
+    font_face_cache.put(key, css)
+    return css
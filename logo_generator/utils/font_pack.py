@@ -0,0 +1,164 @@
+import hashlib
+import io
+import json
+import mmap
+import os
+import struct
+import threading
+
+from django.conf import settings
+
+PACK_MAGIC = b"LOGOFPK1"
+PACK_HEADER = struct.Struct("<8sQ")
+PACK_ALIGNMENT = 8
+FONT_EXTENSIONS = (".ttf", ".otf")
+
+# Font paths served from the pack look like "fontpack:Monoton_regular.ttf"
+PACKED_FONT_PREFIX = "fontpack:"
+
+
+def build_font_pack(font_dir, pack_path):
+    """
+    Bundle every font file of a directory into a single indexed pack.
+
+    Layout: header (magic, index offset), 8-byte aligned font blobs, then a
+    JSON index mapping file names to [offset, length, sha256].
+
+    Returns:
+        Number of fonts written to the pack
+    """
+    names = sorted(
+        name for name in os.listdir(font_dir) if name.lower().endswith(FONT_EXTENSIONS)
+    )
+
+    index = {}
+    tmp_path = f"{pack_path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(PACK_HEADER.pack(PACK_MAGIC, 0))
+        for name in names:
+            with open(os.path.join(font_dir, name), "rb") as font_file:
+                data = font_file.read()
+            f.write(b"\0" * (-f.tell() % PACK_ALIGNMENT))
+            index[name] = [f.tell(), len(data), hashlib.sha256(data).hexdigest()]
+            f.write(data)
+
+        index_offset = f.tell()
+        f.write(json.dumps(index, separators=(",", ":")).encode("utf-8"))
+        f.seek(0)
+        f.write(PACK_HEADER.pack(PACK_MAGIC, index_offset))
+    os.replace(tmp_path, pack_path)
+    return len(names)
+
+
+class FontPack:
+    """Read-only, memory-mapped view of a font pack."""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, index_offset = PACK_HEADER.unpack_from(self._mmap)
+        if magic != PACK_MAGIC:
+            raise Exception(f"Not a font pack: {path}")
+        self.fonts = json.loads(self._mmap[index_offset:])
+
+    def __contains__(self, name):
+        return name in self.fonts
+
+    def view(self, name):
+        """Return a zero-copy view of a font's bytes."""
+        offset, length, _ = self.fonts[name]
+        return memoryview(self._mmap)[offset : offset + length]
+
+    def sha256(self, name):
+        """Return the SHA-256 of a font, recorded when the pack was built."""
+        return self.fonts[name][2]
+
+
+_font_pack = None
+_font_pack_loaded = False
+_font_pack_lock = threading.Lock()
+
+
+def get_font_pack():
+    """Return the process-wide font pack, or None if FONT_PACK_PATH doesn't exist."""
+    global _font_pack, _font_pack_loaded
+    if not _font_pack_loaded:
+        with _font_pack_lock:
+            if not _font_pack_loaded:
+                pack_path = getattr(settings, "FONT_PACK_PATH", None)
+                if pack_path and os.path.exists(pack_path):
+                    _font_pack = FontPack(pack_path)
+                _font_pack_loaded = True
+    return _font_pack
+
+
+def reset_font_pack():
+    """Forget the loaded pack so the next lookup reopens FONT_PACK_PATH."""
+    global _font_pack, _font_pack_loaded
+    with _font_pack_lock:
+        _font_pack = None
+        _font_pack_loaded = False
+
+
+def get_packed_font_path(font_file):
+    """Return the pack path of a font file name, or None if it isn't packed."""
+    pack = get_font_pack()
+    if pack is not None and font_file in pack:
+        return PACKED_FONT_PREFIX + font_file
+    return None
+
+
+def is_packed_font(font_path):
+    """Return whether a font path refers to a font inside the pack."""
+    return isinstance(font_path, str) and font_path.startswith(PACKED_FONT_PREFIX)
+
+
+def read_font_data(font_path):
+    """Return the bytes of a font, as a zero-copy view when it is packed."""
+    if is_packed_font(font_path):
+        return get_font_pack().view(font_path.removeprefix(PACKED_FONT_PREFIX))
+    with open(font_path, "rb") as f:
+        return f.read()
+
+
+class PackedFontFile:
+    """
+    File-like wrapper handing a packed font to ``ImageFont.truetype``.
+
+    This isn't zero-copy: Pillow rejects buffers backed by the map, and it
+    copies the bytes it reads into every FreeType face it loads. A packed
+    font therefore takes its full size in memory for each font size in use,
+    where FreeType reads a loose font file from disk as needed.
+    """
+
+    def __init__(self, view):
+        self.view = view
+
+    def read(self, size=-1):
+        # Only lives until Pillow has made its own copy
+        return bytes(self.view)
+
+
+def open_font_file(font_path):
+    """Return something ``ImageFont.truetype`` can load a font from."""
+    if is_packed_font(font_path):
+        name = font_path.removeprefix(PACKED_FONT_PREFIX)
+        return PackedFontFile(get_font_pack().view(name))
+    return font_path
+
+
+def font_data_size(font_path):
+    """Return the size in bytes of a font file or packed font."""
+    if is_packed_font(font_path):
+        name = font_path.removeprefix(PACKED_FONT_PREFIX)
+        return get_font_pack().fonts[name][1]
+    return os.path.getsize(font_path)
+
+
+def open_font_stream(font_path):
+    """Return a seekable binary stream over a font, for parsers like fontTools."""
+    if is_packed_font(font_path):
+        return io.BytesIO(read_font_data(font_path))
+    return font_path
@@ -0,0 +1,92 @@
+import functools
+import importlib.util
+import io
+import threading
+
+from django.conf import settings
+from logo_generator.utils.font_pack import open_font_stream
+from logo_generator.utils.font_utils import font_file_hash
+from logo_generator.utils.lru_cache import SizedLRUCache
+
+# fontTools (and brotli for WOFF2) are optional: without them fonts are
+# embedded whole. fontTools is only imported when a font is first subset,
+# which keeps it out of the startup of renders that don't embed fonts.
+
+# @font-face format names of the supported subset flavors
+SUBSET_FORMATS = {
+    None: "truetype",
+    "woff2": "woff2",
+}
+
+
+@functools.cache
+def module_available(name):
+    """Return whether a module can be imported, without importing it."""
+    return importlib.util.find_spec(name) is not None
+
+
+def subsetting_available(flavor=None):
+    """Return whether fonts can be subset to the given flavor here."""
+    if not module_available("fontTools"):
+        return False
+    return flavor != "woff2" or module_available("brotli")
+
+
+_subset_cache = None
+_subset_cache_lock = threading.Lock()
+
+
+def get_subset_cache():
+    """Return the process-wide subset cache, creating it from settings on first use."""
+    global _subset_cache
+    if _subset_cache is None:
+        with _subset_cache_lock:
+            if _subset_cache is None:
+                _subset_cache = SizedLRUCache(
+                    getattr(settings, "FONT_SUBSET_CACHE_MAX_BYTES", 16 * 1024 * 1024)
+                )
+    return _subset_cache
+
+
+def subset_font(font_path, text, flavor=None):
+    """
+    Build a font containing only the glyphs needed to render ``text``.
+
+    Layout features are kept so kerning and ligatures still apply.
+
+    Args:
+        font_path: Path of the source font file
+        text: Every character that will be rendered with the font
+        flavor: None for a plain TrueType/OpenType font or "woff2"
+
+    Returns:
+        Bytes of the subset font
+    """
+    glyph_set = "".join(sorted(set(text)))
+    key = (font_file_hash(font_path), glyph_set, flavor)
+    subset_cache = get_subset_cache()
+    data = subset_cache.get(key)
+    if data is not None:
+        return data
+
+    from fontTools import subset as ft_subset
+    from fontTools.ttLib import TTFont
+
+    options = ft_subset.Options()
+    options.layout_features = ["*"]
+    # FontForge's timestamp table can't be subset; drop it without a warning
+    options.drop_tables = options.drop_tables + ["FFTM"]
+    options.flavor = flavor
+    # Keep the source timestamp so identical subsets are byte-identical
+    font = TTFont(open_font_stream(font_path), recalcTimestamp=False)
+    subsetter = ft_subset.Subsetter(options)
+    subsetter.populate(text=glyph_set)
+    subsetter.subset(font)
+
+    buffer = io.BytesIO()
+    font.flavor = flavor
+    font.save(buffer)
+    data = buffer.getvalue()
+
+    subset_cache.put(key, data)
+    return data
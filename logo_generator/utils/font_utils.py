@@ -1,8 +1,18 @@
-import json
+import hashlib
 import os
+import threading
 
-import requests
 from django.conf import settings
+from logo_generator.utils.file_utils import atomic_write, file_lock
+from logo_generator.utils.font_catalog import get_font_catalog
+from logo_generator.utils.font_pack import (
+    PACKED_FONT_PREFIX,
+    get_font_pack,
+    get_packed_font_path,
+    is_packed_font,
+)
+from logo_generator.utils.single_flight import SingleFlight
+from logo_generator.utils.timing import timing_span
 
 
 def get_api_variant(weight, style):
@@ -18,60 +28,90 @@ def get_api_variant(weight, style):
         return base
 
 
+def get_font_cache_dir():
+    """Return the directory holding downloaded fonts."""
+    return os.path.join(settings.BASE_DIR, "font_cache")
+
+
+def get_font_file_name(font_family, variant):
+    """Return the file name under which a font variant is stored."""
+    return f"{font_family.replace(' ', '_')}_{variant}.ttf"
+
+
+def get_cached_font_path(font_family, weight, style):
+    """Return the path of a font if it is packed or has already been downloaded."""
+    font_file = get_font_file_name(font_family, get_api_variant(weight, style))
+    packed_path = get_packed_font_path(font_file)
+    if packed_path:
+        return packed_path
+    local_path = os.path.join(get_font_cache_dir(), font_file)
+    return local_path if os.path.exists(local_path) else None
+
+
 def get_font_path(font_family, weight, style):
-    """Download font from Google Fonts or retrieve from cache."""
+    """Download font from Google Fonts or retrieve from the font pack or cache."""
     variant = get_api_variant(weight, style)
-    cache_dir = os.path.join(settings.BASE_DIR, "font_cache")
-    os.makedirs(cache_dir, exist_ok=True)
-    font_file = f"{font_family.replace(' ', '_')}_{variant}.ttf"
-    local_path = os.path.join(cache_dir, font_file)
+    font_file = get_font_file_name(font_family, variant)
+
+    # Fonts in the pack are served straight from its memory map
+    packed_path = get_packed_font_path(font_file)
+    if packed_path:
+        return packed_path
 
+    cache_dir = get_font_cache_dir()
+    local_path = os.path.join(cache_dir, font_file)
     if os.path.exists(local_path):
         return local_path
 
-    # Cache font list
-    font_list_cache = os.path.join(cache_dir, "font_list.json")
-    fonts = None
-    if os.path.exists(font_list_cache):
-        with open(font_list_cache) as f:
-            fonts = json.load(f)
+    # Threads missing the same font share a single download
+    return _font_downloads.do(
+        local_path, lambda: download_font(font_family, variant, local_path)
+    )
+
 
-    if not fonts:
-        if not settings.GOOGLE_FONTS_API_KEY:
-            raise Exception("Missing GOOGLE_FONTS_API_KEY in environment configuration")
+_font_downloads = SingleFlight()
+
+
+def download_font(font_family, variant, local_path):
+    """Download a font variant to ``local_path`` unless another process did."""
+    cache_dir = os.path.dirname(local_path)
+    os.makedirs(cache_dir, exist_ok=True)
+
+    # The lock makes workers missing the same font wait for one download
+    with file_lock(local_path):
+        if os.path.exists(local_path):
+            return local_path
+
+        # Resolve the download URL from the in-memory catalog index
+        font_url = get_font_catalog(cache_dir).get_variant_url(font_family, variant)
+        # Imported here: most processes never download a font
+        import requests
 
-        # Download font list from Google Fonts API
         try:
-            response = requests.get(
-                f"https://www.googleapis.com/webfonts/v1/webfonts?key={settings.GOOGLE_FONTS_API_KEY}",
-                timeout=10,
-            )
-            response.raise_for_status()
-            fonts = response.json().get("items", [])
-            # Save font list to cache
-            with open(font_list_cache, "w") as f:
-                json.dump(fonts, f)
+            with timing_span("font_fetch"):
+                font_response = requests.get(font_url, timeout=10)
+            font_response.raise_for_status()
         except requests.exceptions.RequestException as e:
-            raise Exception(
-                f"Unable to retrieve font list from Google Fonts API: {str(e)}"
-            )
-
-    # Find font
-    for font in fonts:
-        if font["family"].lower() == font_family.lower():
-            files = font.get("files", {})
-            if variant in files:
-                font_url = files[variant]
-                try:
-                    font_response = requests.get(font_url, timeout=10)
-                    font_response.raise_for_status()
-                    with open(local_path, "wb") as f:
-                        f.write(font_response.content)
-                    return local_path
-                except requests.exceptions.RequestException as e:
-                    raise Exception(
-                        f"Unable to download font from {font_url}: {str(e)}"
-                    )
-            else:
-                raise Exception(f"Variant {variant} not found for font {font_family}")
-    raise Exception(f"Font family {font_family} not found")
+            raise Exception(f"Unable to download font from {font_url}: {str(e)}") from e
+        atomic_write(local_path, font_response.content)
+    return local_path
+
+
+_font_hashes = {}
+_font_hashes_lock = threading.Lock()
+
+
+def font_file_hash(font_path):
+    """Return the SHA-256 of a font file, memoized by path, size and mtime."""
+    if is_packed_font(font_path):
+        return get_font_pack().sha256(font_path.removeprefix(PACKED_FONT_PREFIX))
+
+    stat = os.stat(font_path)
+    key = (os.fspath(font_path), stat.st_size, stat.st_mtime_ns)
+    digest = _font_hashes.get(key)
+    if digest is None:
+        with open(font_path, "rb") as f:
+            digest = hashlib.file_digest(f, "sha256").hexdigest()
+        with _font_hashes_lock:
+            _font_hashes[key] = digest
+    return digest
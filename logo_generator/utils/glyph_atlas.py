@@ -0,0 +1,77 @@
+import math
+import weakref
+
+# Masks kept per font before the atlas is reset
+GLYPH_ATLAS_MAX_ENTRIES = 4096
+
+
+class GlyphAtlas:
+    """Rasterized glyph masks of one font, reused across draws."""
+
+    def __init__(self, font, mode):
+        self.font = font
+        self.mode = mode
+        self.masks = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, char, start):
+        """
+        Return the (mask, offset) of a glyph drawn on the baseline.
+
+        FreeType positions the bitmap according to the sub-pixel part of
+        the pen position, so it is part of the key. Layout positions are
+        multiples of 1/64 px, which bounds the variants per glyph.
+        """
+        key = (char, start)
+        entry = self.masks.get(key)
+        if entry is not None:
+            self.hits += 1
+            return entry
+
+        self.misses += 1
+        if len(self.masks) >= GLYPH_ATLAS_MAX_ENTRIES:
+            self.masks.clear()
+        entry = self.font.getmask2(char, self.mode, anchor="ls", start=start)
+        self.masks[key] = entry
+        return entry
+
+
+_atlases = weakref.WeakKeyDictionary()
+
+
+def get_glyph_atlas(font, mode="L"):
+    """Return the glyph atlas of a font for a mask mode, creating it on first use."""
+    atlases = _atlases.get(font)
+    if atlases is None:
+        atlases = _atlases.setdefault(font, {})
+    atlas = atlases.get(mode)
+    if atlas is None:
+        atlas = atlases.setdefault(mode, GlyphAtlas(font, mode))
+    return atlas
+
+
+def draw_glyph_run(draw, run, font, fill):
+    """
+    Composite every glyph of a laid out run onto a drawing.
+
+    Produces the same pixels as calling ``draw.text`` with the "ls" anchor
+    for each character, but every glyph mask is rasterized only once and
+    the run is composited in a single pass.
+    """
+    ink, fill_ink = draw._getink(fill)
+    if ink is None:
+        ink = fill_ink
+    if ink is None:
+        return
+
+    atlas = get_glyph_atlas(font, draw.fontmode)
+    draw_bitmap = draw.draw.draw_bitmap
+    start_y, y = math.modf(run.y)
+    y = int(y)
+    for char, x in run.glyphs():
+        if char == " ":
+            continue
+        start_x, x = math.modf(x)
+        mask, (offset_x, offset_y) = atlas.get(char, (start_x, start_y))
+        draw_bitmap((int(x) + offset_x, y + offset_y), mask, ink)
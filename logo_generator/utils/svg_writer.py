@@ -0,0 +1,79 @@
+from xml.sax.saxutils import escape, quoteattr
+
+SVG_NAMESPACE = "http://www.w3.org/2000/svg"
+XML_DECLARATION = '<?xml version="1.0" encoding="utf-8" ?>\n'
+
+
+def format_number(value):
+    """Format a coordinate exactly, dropping the fraction of whole numbers."""
+    if isinstance(value, float):
+        return str(int(value)) if value.is_integer() else repr(value)
+    return str(value)
+
+
+def format_attributes(attributes):
+    """Format attributes in sorted order, skipping those set to None."""
+    parts = []
+    for name in sorted(attributes):
+        value = attributes[name]
+        if value is None:
+            continue
+        if isinstance(value, int | float):
+            value = format_number(value)
+        parts.append(f" {name}={quoteattr(str(value))}")
+    return "".join(parts)
+
+
+def element(tag, attributes, content=None):
+    """Return an element; ``content`` is inserted as is and must be escaped."""
+    if content is None:
+        return f"<{tag}{format_attributes(attributes)}/>"
+    return f"<{tag}{format_attributes(attributes)}>{content}</{tag}>"
+
+
+def style_element(css):
+    """Return a <defs> block holding a stylesheet in a CDATA section."""
+    css = css.replace("]]>", "]]]]><![CDATA[>")
+    return f'<defs><style type="text/css"><![CDATA[{css}]]></style></defs>'
+
+
+def text_element(run, attributes):
+    """
+    Return a single <text> element showing a laid out run.
+
+    Every character is positioned by an entry of the ``x`` list, so spaces
+    are preserved rather than collapsed. Characters outside the Basic
+    Multilingual Plane take one entry per UTF-16 code unit, as SVG counts
+    them.
+    """
+    positions = []
+    for char, char_x in run.glyphs():
+        value = format_number(char_x)
+        positions.append(value)
+        if ord(char) > 0xFFFF:
+            positions.append(value)
+
+    attributes = {
+        **attributes,
+        "x": " ".join(positions) or None,
+        "y": run.y,
+        "xml:space": "preserve",
+    }
+    return element("text", attributes, escape(run.text))
+
+
+def svg_document(width, height, children, view_box=None):
+    """
+    Serialize an SVG document from already serialized children.
+
+    Attributes are written in a fixed order and nothing depends on the
+    environment, so the same input always gives the same bytes.
+    """
+    attributes = {
+        "xmlns": SVG_NAMESPACE,
+        "version": "1.1",
+        "width": width,
+        "height": height,
+        "viewBox": view_box,
+    }
+    return XML_DECLARATION + element("svg", attributes, "".join(children))
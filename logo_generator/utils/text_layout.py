@@ -0,0 +1,165 @@
+import weakref
+from dataclasses import dataclass
+
+
+class AdvanceTable:
+    """Glyph advances, kerning pairs and ink boxes for one loaded font."""
+
+    def __init__(self, font):
+        self.font = font
+        self.advances = {}
+        self.kerning = {}
+        self.bboxes = {}
+
+    def prepare(self, text):
+        """Measure every character and adjacent pair of ``text`` not yet known."""
+        font = self.font
+        advances = self.advances
+        for char in set(text) - advances.keys():
+            advance = font.getlength(char)
+            # Ink box relative to the pen position on the baseline
+            bbox = font.getbbox(char, anchor="ls")
+            # Tables are shared between threads: a character counts as known
+            # once it has an advance, so its ink box has to be there first
+            self.bboxes[char] = bbox
+            advances[char] = advance
+
+        kerning = self.kerning
+        for pair in {text[i : i + 2] for i in range(len(text) - 1)} - kerning.keys():
+            # Any difference between the pair and its parts is the kerning
+            kerning[pair] = font.getlength(pair) - advances[pair[0]] - advances[pair[1]]
+
+
+@dataclass(frozen=True)
+class TextRun:
+    """Laid out text: pen position of every character plus the overall geometry."""
+
+    text: str
+    x: float
+    y: float
+    positions: tuple
+    advance: float
+    bbox: tuple
+
+    def glyphs(self):
+        """Return (char, x) pairs for every character of the run."""
+        return zip(self.text, self.positions, strict=True)
+
+    def scaled(self, factor):
+        """
+        Return the run scaled about the origin, for rendering at another size.
+
+        Positions are snapped to 1/64 px like FreeType's own advances, which
+        keeps the number of distinct glyph rasterizations bounded.
+        """
+
+        def snap(value):
+            return round(value * factor * 64) / 64
+
+        return TextRun(
+            text=self.text,
+            x=snap(self.x),
+            y=snap(self.y),
+            positions=tuple(snap(x) for x in self.positions),
+            advance=self.advance * factor,
+            bbox=tuple(v * factor for v in self.bbox) if self.bbox else None,
+        )
+
+    def translated(self, dx, dy):
+        """Return the run moved by (dx, dy), for drawing onto a cropped canvas."""
+        return TextRun(
+            text=self.text,
+            x=self.x + dx,
+            y=self.y + dy,
+            positions=tuple(x + dx for x in self.positions),
+            advance=self.advance,
+            bbox=(
+                (
+                    self.bbox[0] + dx,
+                    self.bbox[1] + dy,
+                    self.bbox[2] + dx,
+                    self.bbox[3] + dy,
+                )
+                if self.bbox
+                else None
+            ),
+        )
+
+
+_tables = weakref.WeakKeyDictionary()
+
+
+def get_advance_table(font):
+    """Return the advance table of a font, creating it on first use."""
+    table = _tables.get(font)
+    if table is None:
+        table = _tables.setdefault(font, AdvanceTable(font))
+    return table
+
+
+def layout_text(font, text, xy, letter_spacing=0, word_spacing=0):
+    """
+    Position every character of a run on a shared baseline.
+
+    Each character advances the pen by its own advance width plus the
+    kerning with the next character, followed by ``word_spacing`` after a
+    space and ``letter_spacing`` after any other character.
+
+    Args:
+        font: Loaded FreeType font
+        text: Text of the run
+        xy: Pen position of the first character on the baseline
+        letter_spacing: Extra space after each non-space character
+        word_spacing: Extra space after each space character
+
+    Returns:
+        TextRun with absolute character positions and the ink bounding box
+    """
+    table = get_advance_table(font)
+    table.prepare(text)
+    advances = table.advances
+    kerning = table.kerning
+    bboxes = table.bboxes
+
+    x, y = xy
+    pen = x
+    positions = []
+    left = top = float("inf")
+    right = bottom = float("-inf")
+    last = len(text) - 1
+    for i, char in enumerate(text):
+        positions.append(pen)
+
+        box_left, box_top, box_right, box_bottom = bboxes[char]
+        if box_right > box_left and box_bottom > box_top:
+            left = min(left, pen + box_left)
+            top = min(top, y + box_top)
+            right = max(right, pen + box_right)
+            bottom = max(bottom, y + box_bottom)
+
+        pen += advances[char] + (word_spacing if char == " " else letter_spacing)
+        if i < last:
+            pen += kerning[text[i : i + 2]]
+
+    bbox = (left, top, right, bottom) if right > left else None
+    return TextRun(
+        text=text,
+        x=x,
+        y=y,
+        positions=tuple(positions),
+        advance=pen - x,
+        bbox=bbox,
+    )
+
+
+def union_bbox(runs):
+    """Return the ink bounding box covering several runs, or None if all are empty."""
+    boxes = [run.bbox for run in runs if run.bbox]
+    if not boxes:
+        return None
+    return (
+        min(box[0] for box in boxes),
+        min(box[1] for box in boxes),
+        max(box[2] for box in boxes),
+        max(box[3] for box in boxes),
+    )
@@ -0,0 +1,151 @@
+import functools
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+# Upper bounds, in seconds, of the stage duration histogram buckets
+HISTOGRAM_BUCKETS = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+
+class Timings:
+    """Spans and annotations recorded while handling one render."""
+
+    def __init__(self):
+        self.spans = []
+        self.notes = {}
+
+    def add(self, name, seconds):
+        self.spans.append((name, seconds))
+
+    def totals(self):
+        """Return {stage: (count, total seconds)} in order of first appearance."""
+        totals = {}
+        for name, seconds in self.spans:
+            count, total = totals.get(name, (0, 0.0))
+            totals[name] = (count + 1, total + seconds)
+        return totals
+
+    def server_timing(self):
+        """Format the spans and annotations as a ``Server-Timing`` header value."""
+        entries = [
+            f"{name};dur={total * 1000:.3f}"
+            for name, (_, total) in self.totals().items()
+        ]
+        entries.extend(f'{name};desc="{desc}"' for name, desc in self.notes.items())
+        return ", ".join(entries)
+
+
+class StageHistograms:
+    """Process-wide histograms of stage durations."""
+
+    def __init__(self, buckets=HISTOGRAM_BUCKETS):
+        self.buckets = buckets
+        self._stages = {}
+        self._lock = threading.Lock()
+
+    def observe(self, name, seconds):
+        with self._lock:
+            stage = self._stages.get(name)
+            if stage is None:
+                stage = self._stages[name] = [[0] * len(self.buckets), 0, 0.0]
+            counts = stage[0]
+            for i, bound in enumerate(self.buckets):
+                if seconds <= bound:
+                    counts[i] += 1
+                    break
+            stage[1] += 1
+            stage[2] += seconds
+
+    def snapshot(self):
+        """Return {stage: (cumulative bucket counts, count, sum)}."""
+        with self._lock:
+            snapshot = {}
+            for name, (counts, count, total) in self._stages.items():
+                cumulative = []
+                running = 0
+                for bucket_count in counts:
+                    running += bucket_count
+                    cumulative.append(running)
+                snapshot[name] = (cumulative, count, total)
+            return snapshot
+
+    def clear(self):
+        with self._lock:
+            self._stages.clear()
+
+
+stage_histograms = StageHistograms()
+
+_current_timings = ContextVar("logo_timings", default=None)
+
+
+@contextmanager
+def collect_timings():
+    """Record the spans of the enclosed code, including calls it makes."""
+    timings = Timings()
+    token = _current_timings.set(timings)
+    try:
+        yield timings
+    finally:
+        _current_timings.reset(token)
+
+
+@contextmanager
+def timing_span(name):
+    """Time a stage into the histograms and the active collector, if any."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        seconds = time.perf_counter() - started
+        stage_histograms.observe(name, seconds)
+        timings = _current_timings.get()
+        if timings is not None:
+            timings.add(name, seconds)
+
+
+def timed(name):
+    """Decorate a function so every call is recorded as a ``name`` span."""
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with timing_span(name):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def annotate(name, desc):
+    """Attach a note, such as a cache outcome, to the active collector."""
+    timings = _current_timings.get()
+    if timings is not None:
+        timings.notes[name] = desc
+
+
+def format_timings(timings):
+    """Return report lines: one per render stage, then the annotations."""
+    lines = [f"{'stage':<16}{'calls':>7}{'total ms':>12}"]
+    for name, (count, total) in timings.totals().items():
+        lines.append(f"{name:<16}{count:>7}{total * 1000:>12.3f}")
+    for name, desc in timings.notes.items():
+        lines.append(f"{name}: {desc}")
+    return lines
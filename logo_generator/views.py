@@ -1,31 +1,265 @@
+import json
+
+from django.http import HttpResponse, HttpResponseNotModified, JsonResponse
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.utils.cache import patch_vary_headers
+from django.utils.http import parse_etags
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_GET, require_POST
 from rest_framework import status
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from .models import RenderJob
 from .serializers import LogoConfigSerializer
-from .services.logo_service import generate_logo
+from .services.async_service import generate_logo_async, render_cache_key_async
+from .services.job_service import enqueue_render_job
+from .services.logo_service import generate_logo, output_content_type
+from .services.metrics_service import PROMETHEUS_CONTENT_TYPE, render_prometheus
+from .services.render_cache import get_render_cache, render_cache_key
+from .utils.compression import (
+    COMPRESSIBLE_CONTENT_TYPES,
+    PREFERRED_ENCODINGS,
+    negotiate_encoding,
+)
+from .utils.timing import collect_timings
+
+# Renders are addressed by their content, so caches may keep them as long as
+# they revalidate the entity tag before each reuse
+RENDER_CACHE_CONTROL = "no-cache"
+
+
+def representation_etag(cache_key, encoding=None):
+    """Return the entity tag of a render, distinct for each content coding."""
+    if encoding:
+        return f'"{cache_key}-{encoding}"'
+    return f'"{cache_key}"'
+
+
+def negotiates_encoding(config):
+    """Return whether the response to a render of ``config`` may be compressed."""
+    return (
+        not config.get("exports")
+        and output_content_type(config) in COMPRESSIBLE_CONTENT_TYPES
+    )
+
+
+def set_cache_headers(response, cache_key, encoding=None, negotiated=False):
+    """
+    Set the caching headers a render response and its 304 have in common.
+
+    ``negotiated`` tells caches that the body depends on ``Accept-Encoding``.
+    """
+    if negotiated:
+        patch_vary_headers(response, ["Accept-Encoding"])
+    if cache_key:
+        response["ETag"] = representation_etag(cache_key, encoding)
+        response["Cache-Control"] = RENDER_CACHE_CONTROL
+
+
+def not_modified_response(request, cache_key, negotiated=False):
+    """Return a 304 response if the client already holds this render."""
+    # The key addresses the exact output, so a client that already holds it,
+    # compressed or not, doesn't need the image again
+    if_none_match = request.headers.get("If-None-Match")
+    if not if_none_match:
+        return None
+    client_etags = parse_etags(if_none_match)
+    for encoding in (None, *PREFERRED_ENCODINGS):
+        if (
+            if_none_match.strip() == "*"
+            or representation_etag(cache_key, encoding) in client_etags
+        ):
+            response = HttpResponseNotModified()
+            set_cache_headers(response, cache_key, encoding, negotiated)
+            return response
+    return None
+
+
+def image_response(result, accept_encoding=None):
+    """
+    Build the HTTP response carrying an encoded logo.
+
+    A precompressed variant is sent when ``accept_encoding`` (the request's
+    ``Accept-Encoding`` header) allows one.
+    """
+    if result.exports:
+        return archive_response(result)
+
+    encoding = negotiate_encoding(accept_encoding, dict(result.encodings))
+    data = result.encoded(encoding) if encoding else result.data
+    response = HttpResponse(data, content_type=result.content_type)
+    response["Content-Disposition"] = f'inline; filename="logo{result.extension}"'
+    if encoding:
+        response["Content-Encoding"] = encoding
+    set_cache_headers(
+        response,
+        result.cache_key,
+        encoding,
+        negotiated=result.content_type in COMPRESSIBLE_CONTENT_TYPES,
+    )
+    response["X-Logo-Width"] = str(result.width)
+    response["X-Logo-Height"] = str(result.height)
+    response["X-Logo-Bytes"] = str(len(result.data))
+    if result.encoder:
+        response["X-Logo-Encoder"] = result.encoder
+    if result.encode_ms is not None:
+        response["X-Logo-Encode-Ms"] = f"{result.encode_ms:.3f}"
+    return response
+
+
+def archive_response(result):
+    """Return a logo and all of its exports together as one ZIP archive."""
+    response = HttpResponse(result.archive(), content_type="application/zip")
+    response["Content-Disposition"] = 'attachment; filename="logo.zip"'
+    set_cache_headers(response, result.cache_key)
+    response["X-Logo-Width"] = str(result.width)
+    response["X-Logo-Height"] = str(result.height)
+    return response
+
+
+def add_server_timing(response, timings):
+    """Expose the stage timings of a request in a ``Server-Timing`` header."""
+    value = timings.server_timing()
+    if value:
+        response["Server-Timing"] = value
+    return response
 
 
 class GenerateLogoView(APIView):
     def post(self, request):
+        with collect_timings() as timings:
+            response = self.generate(request)
+        return add_server_timing(response, timings)
+
+    def generate(self, request):
         serializer = LogoConfigSerializer(data=request.data)
         if serializer.is_valid():
+            config = dict(serializer.validated_data)
             try:
-                # Lưu cấu hình tạm thời vào file
-                import json
-                import os
-
-                from django.conf import settings
-
-                temp_config_path = os.path.join(settings.BASE_DIR, "temp_config.json")
-                with open(temp_config_path, "w") as f:
-                    json.dump(serializer.validated_data, f)
-
-                output_path = generate_logo(temp_config_path)
-                return Response(
-                    {"message": f"Logo created at {output_path}"},
-                    status=status.HTTP_201_CREATED,
+                cache_key = render_cache_key(config)
+                response = not_modified_response(
+                    request, cache_key, negotiates_encoding(config)
                 )
+                if response is not None:
+                    return response
+
+                # Render in memory and send the encoded image back directly
+                result = generate_logo(config, cache_key=cache_key)
             except Exception as e:
                 return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+            return image_response(result, request.headers.get("Accept-Encoding"))
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
+@csrf_exempt
+@require_POST
+async def generate_logo_async_view(request):
+    """
+    Async variant of GenerateLogoView for ASGI deployments.
+
+    Font fetches and rendering run on separate bounded executors, so a
+    cold-font request never stalls the event loop or unrelated renders.
+    """
+    try:
+        data = json.loads(request.body)
+    except ValueError as e:
+        return JsonResponse({"error": f"Invalid JSON: {str(e)}"}, status=400)
+
+    serializer = LogoConfigSerializer(data=data)
+    if not serializer.is_valid():
+        return JsonResponse(serializer.errors, status=400)
+
+    config = dict(serializer.validated_data)
+    with collect_timings() as timings:
+        try:
+            cache_key = await render_cache_key_async(config)
+            response = not_modified_response(
+                request, cache_key, negotiates_encoding(config)
+            )
+            if response is None:
+                result = await generate_logo_async(config, cache_key=cache_key)
+                response = image_response(
+                    result, request.headers.get("Accept-Encoding")
+                )
+        except Exception as e:
+            response = JsonResponse({"error": str(e)}, status=400)
+    return add_server_timing(response, timings)
+
+
+def job_status(request, job):
+    """Describe a render job, with the URL of its result once it is done."""
+    data = {
+        "id": str(job.id),
+        "status": job.status,
+        "attempts": job.attempts,
+        "created_at": job.created_at,
+        "started_at": job.started_at,
+        "finished_at": job.finished_at,
+    }
+    if job.status == RenderJob.Status.FAILED:
+        data["error"] = job.error
+    if job.status == RenderJob.Status.DONE:
+        data["width"] = job.width
+        data["height"] = job.height
+        data["result_url"] = request.build_absolute_uri(
+            reverse("render-job-result", args=[job.id])
+        )
+    return data
+
+
+class RenderJobListView(APIView):
+    def post(self, request):
+        """Queue a render for the worker and return the job without waiting."""
+        serializer = LogoConfigSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        job = enqueue_render_job(dict(serializer.validated_data))
+        return Response(
+            job_status(request, job),
+            status=status.HTTP_202_ACCEPTED,
+            headers={"Location": reverse("render-job", args=[job.id])},
+        )
+
+
+class RenderJobView(APIView):
+    def get(self, request, job_id):
+        job = get_object_or_404(RenderJob.objects.defer("result"), id=job_id)
+        return Response(job_status(request, job))
+
+
+class RenderJobResultView(APIView):
+    def get(self, request, job_id):
+        job = get_object_or_404(RenderJob, id=job_id)
+        if job.status != RenderJob.Status.DONE:
+            return Response(
+                {"error": f"Render job is {job.status}", "status": job.status},
+                status=status.HTTP_409_CONFLICT,
+            )
+        if job.cache_key:
+            response = not_modified_response(request, job.cache_key)
+            if response is not None:
+                return response
+
+        response = HttpResponse(bytes(job.result), content_type=job.content_type)
+        disposition = (
+            "attachment" if job.content_type == "application/zip" else "inline"
+        )
+        response["Content-Disposition"] = f'{disposition}; filename="{job.filename}"'
+        set_cache_headers(response, job.cache_key)
+        response["X-Logo-Width"] = str(job.width)
+        response["X-Logo-Height"] = str(job.height)
+        return response
+
+
+class RenderCacheStatsView(APIView):
+    def get(self, request):
+        return Response(get_render_cache().stats())
+
+
+@require_GET
+def metrics_view(request):
+    """Stage duration histograms and cache counters for Prometheus."""
+    return HttpResponse(render_prometheus(), content_type=PROMETHEUS_CONTENT_TYPE)